@@ -1,13 +1,24 @@
-from typing import Dict, List
+from typing import Dict, List, Optional
+import ast
+import re
 from core.github_client import GitHubClient
 from core.logger import get_logger
 from core.local_model import LocalModel
+from core.model_cache import cached_generate_suggestions
 
 logger = get_logger(__name__)
 
+# AST nodes that add a decision point to a Python control-flow graph
+_BRANCH_NODES = (ast.If, ast.IfExp, ast.For, ast.AsyncFor, ast.While, ast.ExceptHandler,
+                 ast.With, ast.AsyncWith, ast.Assert, ast.comprehension, ast.match_case)
+# Decision keywords/operators for sources that are not Python (C#, JS, C++)
+_BRANCH_TOKENS = re.compile(r'\b(?:if|for|foreach|while|case|catch)\b|&&|\|\||\?\?|\?(?=[^.?])')
+
 class CodeAnalyzer:
-    def __init__(self):
-        self.github_client = GitHubClient()
+    __slots__ = ("github_client", "model")
+    
+    def __init__(self, gh: Optional[GitHubClient] = None):
+        self.github_client = gh or GitHubClient.default()
         self.model = LocalModel()
         
     def analyze_repository(self, context: Dict) -> Dict:
@@ -28,12 +39,16 @@ class CodeAnalyzer:
             
             if analysis_result:
                 logger.info("Analysis complete. Found potential improvements.")
+                # One lazily formatted record per file instead of one per suggestion
                 for file_path, analysis in analysis_result.items():
-                    logger.info(f"File: {file_path}")
-                    if analysis.get('suggestions'):
-                        logger.info("Suggested improvements:")
-                        for suggestion in analysis['suggestions']:
-                            logger.info(f"  - {suggestion}")
+                    suggestions = analysis.get('suggestions')
+                    if suggestions:
+                        logger.opt(lazy=True).info(
+                            "File: {}\nSuggested improvements:\n  - {}",
+                            lambda: file_path, lambda: "\n  - ".join(map(str, suggestions))
+                        )
+                    else:
+                        logger.info("File: {}", file_path)
             else:
                 logger.info("Analysis complete. No immediate improvements needed.")
                 
@@ -54,9 +69,35 @@ class CodeAnalyzer:
     
     def _calculate_complexity(self, code: str) -> Dict:
         """Calculate code complexity metrics."""
-        # Add complexity calculation logic here
-        return {"cyclomatic": 0, "cognitive": 0}
+        try:
+            tree = ast.parse(code)
+        except (SyntaxError, ValueError):
+            # Not Python: approximate by counting decision keywords and operators
+            branches = len(_BRANCH_TOKENS.findall(code))
+            return {"cyclomatic": 1 + branches, "cognitive": branches}
+        
+        cyclomatic = 1
+        for node in ast.walk(tree):
+            if isinstance(node, _BRANCH_NODES):
+                cyclomatic += 1 + (len(node.ifs) if isinstance(node, ast.comprehension) else 0)
+            elif isinstance(node, ast.BoolOp):
+                cyclomatic += len(node.values) - 1
+        return {"cyclomatic": cyclomatic, "cognitive": self._cognitive_complexity(tree)}
+    
+    def _cognitive_complexity(self, node: ast.AST, nesting: int = 0) -> int:
+        """Sum of decision points, each weighted by how deeply it is nested."""
+        score = 0
+        for child in ast.iter_child_nodes(node):
+            if isinstance(child, (ast.If, ast.For, ast.AsyncFor, ast.While, ast.ExceptHandler, ast.IfExp)):
+                score += 1 + nesting + self._cognitive_complexity(child, nesting + 1)
+            elif isinstance(child, ast.BoolOp):
+                score += 1 + self._cognitive_complexity(child, nesting)
+            elif isinstance(child, (ast.FunctionDef, ast.AsyncFunctionDef, ast.Lambda)):
+                score += self._cognitive_complexity(child, nesting + 1)
+            else:
+                score += self._cognitive_complexity(child, nesting)
+        return score
     
     def _generate_suggestions(self, file: Dict, context: Dict) -> List[str]:
         """Generate code improvement suggestions using the local model."""
-        return self.model.generate_suggestions(file, context)
+        return cached_generate_suggestions(self.model, file, context)
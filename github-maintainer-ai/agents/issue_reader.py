@@ -1,22 +1,28 @@
-from typing import List, Dict
+from typing import List, Dict, Optional
+import re
 from core.github_client import GitHubClient
 from core.logger import get_logger
 
 logger = get_logger(__name__)
 
 class IssueReader:
-    def __init__(self, repo_url):
+    __slots__ = ("repo_url", "github_client")
+    
+    def __init__(self, repo_url, gh: Optional[GitHubClient] = None):
         """Initialize IssueReader with a repository URL.
         
         Args:
             repo_url (str): HTTPS clone URL of the repository
+            gh (GitHubClient, optional): Shared client; defaults to the process-wide one
         """
-        self.github_client = GitHubClient({'url': repo_url})
+        self.repo_url = repo_url
+        self.github_client = gh or GitHubClient.default()
         
     def get_open_issues(self) -> List[Dict]:
         """Fetch and analyze open issues from the repository."""
         try:
-            issues = self.github_client.get_open_issues()
+            owner, name = re.split(r"[/:]", self.repo_url.rstrip("/").removesuffix(".git"))[-2:]
+            issues = self.github_client.graphql_open_issues(owner, name)
             return self._analyze_issues(issues)
         except Exception as e:
             logger.error(f"Error fetching open issues: {e}")
@@ -1,13 +1,16 @@
-from typing import Dict, List
+from typing import Dict, List, Optional
 from core.github_client import GitHubClient
 from core.logger import get_logger
 from core.local_model import LocalModel
+from core.model_cache import cached_generate_changes
 
 logger = get_logger(__name__)
 
 class PatchPlanner:
-    def __init__(self):
-        self.github_client = GitHubClient()
+    __slots__ = ("github_client", "model")
+    
+    def __init__(self, gh: Optional[GitHubClient] = None):
+        self.github_client = gh or GitHubClient.default()
         self.model = LocalModel()
     
     def plan_patches(self, analysis: Dict, context: Dict) -> List[Dict]:
@@ -24,13 +27,10 @@ class PatchPlanner:
             patch_plans = self._generate_patch_plans(analysis, context)
             
             if patch_plans:
-                logger.info(f"Generated {len(patch_plans)} patch plans")
+                logger.info("Generated {} patch plans", len(patch_plans))
+                # One lazily formatted record per patch instead of one per field
                 for i, patch in enumerate(patch_plans, 1):
-                    logger.info(f"Patch {i}:")
-                    logger.info(f"  File: {patch['file_path']}")
-                    logger.info(f"  Priority: {patch.get('priority', 'medium')}")
-                    if patch.get('estimated_impact'):
-                        logger.info(f"  Risk Level: {patch['estimated_impact'].get('risk_level', 'unknown')}")
+                    logger.opt(lazy=True).info("{}", lambda: self._describe_patch(i, patch))
             else:
                 logger.info("No patches needed or could not generate appropriate patches")
             
@@ -39,6 +39,17 @@ class PatchPlanner:
             logger.error(f"Error planning patches: {e}")
             return []
     
+    def _describe_patch(self, index: int, patch: Dict) -> str:
+        """Format a patch plan summary for logging."""
+        lines = [
+            f"Patch {index}:",
+            f"  File: {patch['file_path']}",
+            f"  Priority: {patch.get('priority', 'medium')}"
+        ]
+        if patch.get('estimated_impact'):
+            lines.append(f"  Risk Level: {patch['estimated_impact'].get('risk_level', 'unknown')}")
+        return "\n".join(lines)
+    
     def _generate_patch_plans(self, analysis: Dict, context: Dict) -> List[Dict]:
         """Generate detailed patch plans for each file."""
         patch_plans = []
@@ -52,7 +63,7 @@ class PatchPlanner:
         """Create a specific patch plan for a file."""
         return {
             "file_path": file_path,
-            "changes": self.model.generate_changes(analysis, context),
+            "changes": cached_generate_changes(self.model, analysis, context),
             "priority": self._calculate_priority(analysis),
             "estimated_impact": self._estimate_impact(analysis)
         }
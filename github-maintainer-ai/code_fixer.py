@@ -1,11 +1,17 @@
 #!/usr/bin/env python3
 
-from typing import List, Optional, Dict
+from typing import List, Optional, Dict, Set, Tuple
 import ast
+import atexit
+import queue
 import re
+import threading
+from concurrent.futures import ThreadPoolExecutor
+from charset_normalizer import from_bytes
 from github import Repository, Issue
 from loguru import logger
 from issue_analyzer import CodeFix
+from core.github_client import GitHubClient
 from core.learning_system import LearningSystem
 from core.dependency_analyzer import MultiFileDependencyAnalyzer
 from speed_fixes import (
@@ -15,7 +21,288 @@ from speed_fixes import (
     _fix_speed_general
 )
 
+# Speed-related code patterns. Compiled once at import; _SPEED_ANY folds them into a
+# single alternation so each scanned line costs one search instead of one per pattern.
+_SPEED_PATTERN_SOURCES = (
+    # Zero speed comparisons (case-insensitive)
+    r'speed\s*[=<>!]=?\s*0(?:\.0+)?[f]?\s*[,;)]',  # Covers =, ==, <=, >=, != with optional float/double suffix
+    r'speed\s*[=<>!]=?\s*0\.[0-9]*[f]?\s*[,;)]',  # Floating point comparisons
+    r'if\s*\(\s*speed\s*[=<>!]=?\s*0',  # Zero speed checks in if statements
+    r'return\s+0[f]?\s*;\s*//.*speed',  # Zero speed returns
+
+    # Speed property/variable patterns
+    r'float\s+speed\s*=\s*[^;]+;',  # Speed variable declarations
+    r'double\s+speed\s*=\s*[^;]+;',
+    r'int\s+speed\s*=\s*[^;]+;',
+    r'private\s+(?:float|double|int)\s+_?speed\s*[{;]',  # Private speed fields
+    r'public\s+(?:float|double|int)\s+Speed\s*\{[^}]*\}',  # Speed property
+    r'protected\s+(?:float|double|int)\s+Speed\s*\{[^}]*\}',
+
+    # Method patterns
+    r'(?:public|private|protected)\s+(?:float|double|int)\s+GetSpeed\s*\([^)]*\)\s*\{',  # GetSpeed method
+    r'void\s+(?:Set|Update|Calculate)Speed\s*\([^)]*\)\s*\{',  # Speed update methods
+    r'float\s+Calculate(?:Current)?Speed\s*\([^)]*\)\s*\{',  # Speed calculation methods
+
+    # Speed calculations and conversions
+    r'speed\s*=\s*(?:Math\.)?(?:Round|Floor|Ceiling)\(',  # Math operations
+    r'speed\s*[+\-*/]=',  # Speed arithmetic
+    r'MPH\s*[=<>!]=?\s*0',  # MPH zero checks
+    r'_?speed\s*=\s*[^;]+mph[^;]*;',  # Speed with MPH unit
+    r'ConvertToMPH\(.*speed.*\)',  # Speed conversions
+    r'ConvertFromMPH\(.*speed.*\)',
+
+    # Display/formatting patterns
+    r'string\.Format\s*\(\s*"{0:F[0-9]}\s*MPH"\s*,\s*speed\s*\)',  # String formatting
+    r'\$"{speed:F[0-9]}\s*MPH"',  # String interpolation
+    r'DisplaySpeed\s*=\s*[^;]+speed[^;]*;',  # Speed display assignments
+
+    # Comments and regions
+    r'//.*\bspeed\b.*(?:calculation|check|validation)',  # Speed-related comments
+    r'/\*.*\bspeed\b.*\*/',  # Multi-line comments
+    r'#region.*\bspeed\b.*#endregion',  # Code regions
+)
+_SPEED_PATTERNS = tuple(re.compile(p, re.IGNORECASE) for p in _SPEED_PATTERN_SOURCES)
+_SPEED_ANY = re.compile("|".join(f"(?:{p})" for p in _SPEED_PATTERN_SOURCES), re.IGNORECASE)
+_NEWLINE = re.compile(r'\n')
+
+def _line_starts(content: str) -> List[int]:
+    """Returns the offset in content at which each line starts."""
+    line_starts = [0]
+    line_starts.extend(m.end() for m in _NEWLINE.finditer(content))
+    return line_starts
+
+def _line_span(content: str, line_starts: List[int], start: int, end: int) -> str:
+    """Returns the 0-based lines [start, end) of content, sliced straight from the string."""
+    stop = line_starts[end] - 1 if end < len(line_starts) else len(content)
+    return content[line_starts[start]:stop]
+
+def _speed_hit_lines(content: str) -> Set[int]:
+    """Returns the 1-based numbers of lines matching a speed pattern.
+
+    Lines are matched one at a time, so patterns never span a newline and a line
+    without "speed" or "mph" (which every pattern contains) is skipped unsearched.
+    """
+    return {
+        i for i, line in enumerate(content.split('\n'), 1)
+        if _KW_SPEED.search(line) and _SPEED_ANY.search(line)
+    }
+
+# Issue keywords that select a fix strategy in _analyze_and_fix. _KW_SPEED doubles as
+# the file prefilter for the speed scan, since every speed pattern contains one of them.
+_KW_SPEED = re.compile(r'speed|mph', re.IGNORECASE)
+_KW_ERROR_HANDLING = re.compile(r'error handling|exception', re.IGNORECASE)
+
+# Statement fields holding nested statements rather than the statement's own expressions
+_STMT_BODY_FIELDS = ("body", "orelse", "finalbody", "handlers", "cases")
+
+def _scan_speed_regex(content: str) -> List[Tuple[int, int, int, str]]:
+    """Finds speed-related blocks with the regex patterns, using brace balancing for extent.
+    
+    Returns ``(line_num, first_line, last_line, block)`` tuples with 1-based line numbers.
+    """
+    # Index line offsets so lines and context windows are sliced from content directly
+    line_starts = _line_starts(content)
+    line_count = len(line_starts)
+    
+    # Scan the whole file once and remember which lines start a match
+    hit_lines = _speed_hit_lines(content)
+    
+    # Find all matches with context
+    matches = []
+    current_block = None
+    current_block_lines = []
+    block_start = block_end = 0
+    # Running brace balance of current_block_lines, so closing a block never rescans it
+    brace_depth = 0
+    opened = False
+    
+    for line_num in range(1, line_count + 1):
+        line = _line_span(content, line_starts, line_num - 1, line_num)
+        # Check if this line starts a new block
+        if line_num in hit_lines:
+            if current_block:
+                # Save previous block if it exists
+                matches.append((current_block, block_start, block_end, '\n'.join(current_block_lines)))
+            # Start new block with context
+            current_block = line_num
+            current_block_lines = []
+            # Get context around the line
+            start = max(0, line_num - 5)
+            end = min(line_count, line_num + 6)
+            context = _line_span(content, line_starts, start, end)
+            current_block_lines.append(context)
+            block_start, block_end = start + 1, end
+            opens = context.count('{')
+            brace_depth = opens - context.count('}')
+            opened = opens > 0
+            logger.info(f"Found speed-related code at line {line_num}")
+            logger.info(f"Context:\n{context}")
+        
+        # Check if we're in a block with braces
+        if current_block and ('{' in line or '}' in line):
+            current_block_lines.append(line)
+            block_end = max(block_end, line_num)
+            opens = line.count('{')
+            brace_depth += opens - line.count('}')
+            opened = opened or opens > 0
+            # Check if block is complete
+            if brace_depth == 0 and opened:
+                matches.append((current_block, block_start, block_end, '\n'.join(current_block_lines)))
+                current_block = None
+                current_block_lines = []
+    
+    return matches
+
+def _stmt_mentions_speed(stmt: ast.stmt) -> bool:
+    """Checks a statement's own expressions (not its nested body) for speed identifiers."""
+    if isinstance(stmt, (ast.FunctionDef, ast.AsyncFunctionDef)) and _KW_SPEED.search(stmt.name):
+        return True
+    for field in stmt._fields:
+        if field in _STMT_BODY_FIELDS:
+            continue
+        value = getattr(stmt, field)
+        for node in value if isinstance(value, list) else [value]:
+            if not isinstance(node, ast.AST):
+                continue
+            for child in ast.walk(node):
+                if isinstance(child, ast.Name):
+                    name = child.id
+                elif isinstance(child, ast.Attribute):
+                    name = child.attr
+                elif isinstance(child, ast.arg):
+                    name = child.arg
+                else:
+                    continue
+                if _KW_SPEED.search(name):
+                    return True
+    return False
+
+def _scan_speed_python(content: str) -> List[Tuple[int, int, int, str]]:
+    """Finds speed-related statements in Python source by walking its AST.
+    
+    Unlike the regex scan this ignores comments and strings and returns whole
+    statements, including multi-line ones. Raises SyntaxError for non-Python input.
+    """
+    tree = ast.parse(content)
+    matches = []
+    
+    def visit(statements: List[ast.stmt]):
+        for stmt in statements:
+            if _stmt_mentions_speed(stmt):
+                matches.append((stmt.lineno, stmt.lineno, stmt.end_lineno, ast.get_source_segment(content, stmt)))
+                continue
+            for field in _STMT_BODY_FIELDS:
+                for child in getattr(stmt, field, None) or []:
+                    # Except handlers and match cases wrap their own statement lists
+                    visit(child.body if isinstance(child, (ast.ExceptHandler, ast.match_case)) else [child])
+    
+    visit(tree.body)
+    for line_num, *_ in matches:
+        logger.info(f"Found speed-related code at line {line_num}")
+    return matches
+
+def _merge_overlapping_blocks(content: str, blocks: List[Tuple[int, int, int, str]]) -> List[Tuple[int, str]]:
+    """Merges blocks whose line ranges overlap and drops duplicate block texts.
+    
+    A merged block is re-sliced from content over its combined line range, so text
+    shared by several context windows is analyzed once.
+    """
+    merged = []
+    for line_num, first, last, block in sorted(blocks, key=lambda b: b[1]):
+        if merged and first <= merged[-1][2]:
+            prev_line, prev_first, prev_last, _ = merged[-1]
+            merged[-1] = (prev_line, prev_first, max(prev_last, last), None)
+        else:
+            merged.append((line_num, first, last, block))
+    
+    line_starts = _line_starts(content)
+    result = []
+    seen = set()
+    for line_num, first, last, block in merged:
+        if block is None:
+            block = _line_span(content, line_starts, first - 1, last)
+        if block not in seen:
+            seen.add(block)
+            result.append((line_num, block))
+    return result
+
+# Replacement code templates, built once at import rather than on every call
+_IMPROVED_TRAIN_SPEED = '''double currentSpeed = train.TrainSpeedMph;
+                    // Handle very small speeds (effectively stopped)
+                    if (Math.Abs(currentSpeed) <= 0.01)
+                    {
+                        currentSpeed = 0.0;  // Explicitly set to zero
+                        train.Status = TrainStatus.Stopped;
+                    }
+                    double lastKnownSpeed = lastSpeed.ContainsKey(id) ? lastSpeed[id] : currentSpeed;
+                    lastSpeed[id] = currentSpeed;
+
+                    // Log speed changes
+                    if (Math.Abs(currentSpeed - lastKnownSpeed) > 0.1)  // Only log significant changes
+                    {
+                        string status = currentSpeed == 0.0 ? "stopped" : 
+                                      currentSpeed > lastKnownSpeed ? "accelerating" : "decelerating";
+                        string msg = $"[{simNow:T}] {train.EngineerName} on {train.TrainSymbol} {status} " +
+                                   $"(Speed: {currentSpeed:F1} MPH, Change: {(currentSpeed - lastKnownSpeed):F1} MPH)";
+                        Logger.LogDebug(msg);
+                        if (discordEnabled && (currentSpeed == 0.0 || Math.Abs(currentSpeed - lastKnownSpeed) > 5.0))
+                        {
+                            await discordClient.SendMessage(msg);
+                        }
+                    }'''
+
+_IMPROVED_CS = '''// Check if vehicle is effectively stopped
+if (Math.Abs(speed) <= 0.01f)
+{
+    speed = 0f;  // Explicitly set to zero
+    status = VehicleStatus.Stopped;
+    _displayedSpeed = "Stopped";  // Human-readable status
+    Logger.LogDebug("Vehicle speed below threshold, marked as stopped");
+}
+else
+{
+    _displayedSpeed = $"{speed:F1} MPH";  // One decimal place for non-zero speeds
+    Logger.LogDebug($"Vehicle speed updated to {_displayedSpeed}");
+}'''
+
+_IMPROVED_PY = '''# Check if vehicle is effectively stopped
+if abs(speed) <= 0.01:
+    speed = 0.0  # Explicitly set to zero
+    status = VehicleStatus.STOPPED
+    displayed_speed = "Stopped"  # Human-readable status
+    logger.debug("Vehicle speed below threshold, marked as stopped")
+else:
+    displayed_speed = f"{speed:.1f} MPH"  # One decimal place for non-zero speeds
+    logger.debug(f"Vehicle speed updated to {displayed_speed}")'''
+
+_IMPROVED_BY_LANG = {"cs": _IMPROVED_CS, "py": _IMPROVED_PY}
+
+# Analysis details recorded for every speed fix
+_SPEED_TESTING_STEPS = (
+    "Test with speed = 0.0",
+    "Test with speed = 0.01",
+    "Test with negative speeds",
+    "Test with very high speeds",
+    "Verify display formatting"
+)
+_SPEED_CONSIDERATIONS = (
+    "Added proper floating-point comparison",
+    "Improved error handling",
+    "Enhanced speed display formatting",
+    "Added debug logging"
+)
+_SPEED_IMPACTS = (
+    "Changed speed comparison logic",
+    "Modified display formatting",
+    "Added logging statements"
+)
+
+MAX_FILE_WORKERS = 8  # concurrent file analyses in generate_fix
+
 class FixAnalysis:
+    # Slots keep per-file analyses small when scanning large repositories
+    __slots__ = ("changes", "testing_steps", "considerations", "potential_impacts")
+    
     def __init__(self):
         self.changes: List[str] = []
         self.testing_steps: List[str] = []
@@ -23,11 +310,49 @@ class FixAnalysis:
         self.potential_impacts: List[str] = []
 
 class CodeFixer:
-    def __init__(self, repo: Repository):
+    __slots__ = ("repo", "github_client", "_local", "learning_system", "dependency_analyzer",
+                 "_dependency_lock", "_learn_q", "_learn_thread")
+    
+    def __init__(self, repo: Repository, gh: Optional[GitHubClient] = None):
         self.repo = repo
-        self._current_analysis = None
+        self.github_client = gh or GitHubClient.default()
+        self._local = threading.local()
         self.learning_system = LearningSystem()
-        self.dependency_analyzer = MultiFileDependencyAnalyzer(repo)
+        self.dependency_analyzer = MultiFileDependencyAnalyzer(repo, self.github_client)
+        # The dependency analyzer keeps one analysis at a time, so concurrent
+        # generate_fix calls take turns using it
+        self._dependency_lock = threading.Lock()
+        
+        # Learning writes to disk, so it runs on a background thread fed by a queue
+        self._learn_q = queue.Queue()
+        self._learn_thread = threading.Thread(target=self._learn_worker, daemon=True)
+        self._learn_thread.start()
+        # Drain pending events before the interpreter tears down the daemon thread
+        atexit.register(self._learn_q.join)
+    
+    def _learn_worker(self):
+        """Feeds queued fix attempts to the learning system, one at a time."""
+        while True:
+            event = self._learn_q.get()
+            try:
+                self.learning_system.learn_from_fix(**event)
+            except Exception as e:
+                logger.error(f"Error recording fix attempt: {str(e)}")
+            finally:
+                self._learn_q.task_done()
+    
+    def wait_for_learning(self):
+        """Blocks until every queued fix attempt has been learned from."""
+        self._learn_q.join()
+    
+    @property
+    def _current_analysis(self) -> Optional[FixAnalysis]:
+        """The analysis being built by the current thread."""
+        return getattr(self._local, "analysis", None)
+    
+    @_current_analysis.setter
+    def _current_analysis(self, analysis: Optional[FixAnalysis]):
+        self._local.analysis = analysis
     
     def get_analysis(self) -> Optional[FixAnalysis]:
         """Returns the analysis from the last fix generation."""
@@ -35,26 +360,16 @@ class CodeFixer:
     
     def generate_fix(self, issue: Issue, affected_files: List[str]) -> Optional[List[CodeFix]]:
         """Generates fixes for the affected files based on the issue description."""
+        # Set up before the try block so the failure path can always record the attempt
+        issue_data = {}
+        fix_data = {
+            "patterns_found": [],
+            "strategy": "",
+            "changes": []
+        }
         try:
             fixes = []
-            fix_data = {
-                "patterns_found": [],
-                "strategy": "",
-                "changes": []
-            }
 
-            # Analyze dependencies
-            logger.info("Analyzing file dependencies...")
-            self.dependency_analyzer.analyze_dependencies(affected_files)
-            
-            # Get potential impact
-            impact = self.dependency_analyzer.analyze_change_impact(affected_files)
-            logger.info("Change impact analysis:")
-            for file, details in impact.items():
-                logger.info(f"File: {file}")
-                logger.info(f"  Risk Level: {details['risk_level']}")
-                logger.info(f"  Dependent Files: {len(details['dependent_files'])}")
-            
             # Get fix suggestions from learning system
             issue_data = {
                 "title": issue.title,
@@ -67,77 +382,59 @@ class CodeFixer:
                 for suggestion in suggestions.get("strategy_suggestions", []):
                     logger.info(f"Strategy: {suggestion['strategy']} (Success rate: {suggestion['success_rate']:.2f})")
             
-            # Get all potentially affected files
-            all_affected = self.dependency_analyzer.get_affected_files(affected_files)
-            if len(all_affected) > len(affected_files):
-                logger.info(f"Found additional affected files: {set(all_affected) - set(affected_files)}")
+            with self._dependency_lock:
+                # Analyze dependencies
+                logger.info("Analyzing file dependencies...")
+                self.dependency_analyzer.analyze_dependencies(affected_files)
+                
+                # Get potential impact
+                impact = self.dependency_analyzer.analyze_change_impact(affected_files)
+                logger.info("Change impact analysis:")
+                for file, details in impact.items():
+                    logger.info(f"File: {file}")
+                    logger.info(f"  Risk Level: {details['risk_level']}")
+                    logger.info(f"  Dependent Files: {len(details['dependent_files'])}")
+                
+                # Get all potentially affected files
+                all_affected = self.dependency_analyzer.get_affected_files(affected_files)
+                additional = all_affected.difference(affected_files)
+                if additional:
+                    logger.opt(lazy=True).info("Found additional affected files: {}", lambda: sorted(additional))
+                
+                # Reuse the contents the dependency analysis already read
+                contents_map = self.dependency_analyzer.get_cached_contents(all_affected)
             
-            # Process each affected file
-            for file_path in all_affected:
-                try:
-                    # Get the file content
-                    file_content = self.repo.get_contents(file_path)
-                    
-                    # Log file details
-                    logger.info(f"Analyzing file: {file_path}")
-                    logger.info(f"File size: {file_content.size} bytes")
-                    logger.info(f"File encoding: {file_content.encoding}")
-                    
-                    # Get raw content
-                    raw_content = file_content.decoded_content
-                    content = None
-                    
-                    # Try to decode with different encodings
-                    for encoding in ['utf-8', 'utf-16', 'latin1', 'ascii']:
-                        try:
-                            content = raw_content.decode(encoding)
-                            logger.info(f"Successfully decoded with {encoding}")
-                            break
-                        except UnicodeDecodeError:
-                            logger.warning(f"Failed to decode with {encoding}")
-                            continue
-                    
-                    if content is None:
-                        logger.error(f"Could not decode {file_path} with any known encoding")
-                        continue
-                    
-                    # Log a sample of the content
-                    preview = content[:200]
-                    if len(content) > 200:
-                        preview += '...'
-                    logger.info(f"Content preview:\n{preview}")
-                    
-                    # Initialize analysis for this file
-                    analysis = FixAnalysis()
+            # Fetch the rest up front in as few round-trips as possible
+            missing = all_affected.difference(contents_map)
+            if missing:
+                contents_map.update(self.github_client.batch_get_contents(self.repo.full_name, missing))
+            
+            # Process the affected files concurrently; the work is dominated by network I/O
+            with ThreadPoolExecutor(max_workers=MAX_FILE_WORKERS) as executor:
+                results = list(executor.map(
+                    lambda file_path: self._process_file(file_path, issue, impact, contents_map),
+                    all_affected
+                ))
+            
+            for file_path, (fix, analysis) in zip(all_affected, results):
+                if analysis:
+                    # Keep the "last analysis" semantics of the sequential loop
                     self._current_analysis = analysis
-                    
-                    # Record impact analysis in current analysis
-                    if file_path in impact:
-                        analysis.potential_impacts.extend([
-                            f"Affects {len(impact[file_path]['dependent_files'])} dependent files",
-                            f"Risk Level: {impact[file_path]['risk_level']}"
-                        ])
-                    
-                    # Analyze the issue and content to determine the fix
-                    fix = self._analyze_and_fix(issue, file_path, content)
-                    if fix:
-                        fixes.append(fix)
-                        fix_data["changes"].append({
-                            "file": file_path,
-                            "description": fix.description
-                        })
-                except Exception as e:
-                    logger.error(f"Error processing file {file_path}: {str(e)}")
-                    continue
+                if fix:
+                    fixes.append(fix)
+                    fix_data["changes"].append({
+                        "file": file_path,
+                        "description": fix.description
+                    })
             
             # Learn from this fix attempt
             if fixes:
-                self.learning_system.learn_from_fix(
-                    issue_data=issue_data,
-                    files=affected_files,
-                    fix_data=fix_data,
-                    success=True
-                )
+                self._learn_q.put({
+                    "issue_data": issue_data,
+                    "files": affected_files,
+                    "fix_data": fix_data,
+                    "success": True
+                })
             
             return fixes if fixes else None
             
@@ -145,26 +442,73 @@ class CodeFixer:
             logger.error(f"Error generating fixes: {str(e)}")
             
             # Learn from failed attempt
-            self.learning_system.learn_from_fix(
-                issue_data=issue_data,
-                files=affected_files,
-                fix_data=fix_data,
-                success=False
-            )
+            self._learn_q.put({
+                "issue_data": issue_data,
+                "files": affected_files,
+                "fix_data": fix_data,
+                "success": False
+            })
             
             return None
     
+    def _process_file(self, file_path: str, issue: Issue, impact: Dict,
+                      contents_map: Dict[str, bytes]) -> Tuple[Optional[CodeFix], Optional[FixAnalysis]]:
+        """Analyzes a single affected file and returns its fix and analysis, if any."""
+        try:
+            # Get raw content, falling back to the REST API for files GraphQL could not return
+            raw_content = contents_map.get(file_path)
+            if raw_content is None:
+                raw_content = self.repo.get_contents(file_path).decoded_content
+            
+            # Log file details
+            logger.info(f"Analyzing file: {file_path}")
+            logger.info(f"File size: {len(raw_content)} bytes")
+            
+            # Decode as UTF-8, detecting the encoding only when that fails
+            try:
+                content = raw_content.decode("utf-8")
+            except UnicodeDecodeError:
+                best = from_bytes(raw_content).best()
+                content = str(best) if best else None
+            
+            if content is None:
+                logger.error(f"Could not decode {file_path} with any known encoding")
+                return None, None
+            
+            # Log a sample of the content
+            preview = content[:200]
+            if len(content) > 200:
+                preview += '...'
+            logger.info(f"Content preview:\n{preview}")
+            
+            # Initialize analysis for this file
+            analysis = FixAnalysis()
+            self._current_analysis = analysis
+            
+            # Record impact analysis in current analysis
+            if file_path in impact:
+                analysis.potential_impacts.extend([
+                    f"Affects {len(impact[file_path]['dependent_files'])} dependent files",
+                    f"Risk Level: {impact[file_path]['risk_level']}"
+                ])
+            
+            # Analyze the issue and content to determine the fix
+            fix = self._analyze_and_fix(issue, file_path, content)
+            return fix, self._current_analysis
+        except Exception as e:
+            logger.error(f"Error processing file {file_path}: {str(e)}")
+            return None, None
+    
     def _analyze_and_fix(self, issue: Issue, file_path: str, content: str) -> Optional[CodeFix]:
         """Analyzes the code and generates a fix based on the issue description."""
         try:
-            # Extract key information from the issue
-            title = issue.title.lower()
-            body = (issue.body or "").lower()
+            # Search title and body case-insensitively without lowercasing copies of them
+            title_body = f"{issue.title}\n{issue.body or ''}"
             
             # Look for specific patterns that indicate what needs to be fixed
-            if "speed" in title or "speed" in body or "mph" in title or "mph" in body:
-                return self._analyze_speed_calculation(content)
-            elif "error handling" in title or "exception" in body:
+            if _KW_SPEED.search(title_body):
+                return self._analyze_speed_calculation(content, file_path)
+            elif _KW_ERROR_HANDLING.search(title_body):
                 return self._fix_error_handling(content)
             # Add more patterns as needed
             
@@ -179,85 +523,30 @@ class CodeFixer:
         try:
             logger.info("Starting speed calculation analysis")
             
-            # Search for speed-related code sections
-            speed_patterns = [
-                # Zero speed comparisons (case-insensitive)
-                r'(?i)speed\s*[=<>!]=?\s*0(?:\.0+)?[f]?\s*[,;)]',  # Covers =, ==, <=, >=, != with optional float/double suffix
-                r'(?i)speed\s*[=<>!]=?\s*0\.[0-9]*[f]?\s*[,;)]',  # Floating point comparisons
-                r'(?i)if\s*\(\s*speed\s*[=<>!]=?\s*0',  # Zero speed checks in if statements
-                r'(?i)return\s+0[f]?\s*;\s*//.*speed',  # Zero speed returns
-                
-                # Speed property/variable patterns
-                r'(?i)float\s+speed\s*=\s*[^;]+;',  # Speed variable declarations
-                r'(?i)double\s+speed\s*=\s*[^;]+;',
-                r'(?i)int\s+speed\s*=\s*[^;]+;',
-                r'(?i)private\s+(?:float|double|int)\s+_?speed\s*[{;]',  # Private speed fields
-                r'(?i)public\s+(?:float|double|int)\s+Speed\s*\{[^}]*\}',  # Speed property
-                r'(?i)protected\s+(?:float|double|int)\s+Speed\s*\{[^}]*\}',
-                
-                # Method patterns
-                r'(?i)(?:public|private|protected)\s+(?:float|double|int)\s+GetSpeed\s*\([^)]*\)\s*\{',  # GetSpeed method
-                r'(?i)void\s+(?:Set|Update|Calculate)Speed\s*\([^)]*\)\s*\{',  # Speed update methods
-                r'(?i)float\s+Calculate(?:Current)?Speed\s*\([^)]*\)\s*\{',  # Speed calculation methods
-                
-                # Speed calculations and conversions
-                r'(?i)speed\s*=\s*(?:Math\.)?(?:Round|Floor|Ceiling)\(',  # Math operations
-                r'(?i)speed\s*[+\-*/]=',  # Speed arithmetic
-                r'(?i)MPH\s*[=<>!]=?\s*0',  # MPH zero checks
-                r'(?i)_?speed\s*=\s*[^;]+mph[^;]*;',  # Speed with MPH unit
-                r'(?i)ConvertToMPH\(.*speed.*\)',  # Speed conversions
-                r'(?i)ConvertFromMPH\(.*speed.*\)',
-                
-                # Display/formatting patterns
-                r'(?i)string\.Format\s*\(\s*"{0:F[0-9]}\s*MPH"\s*,\s*speed\s*\)',  # String formatting
-                r'(?i)\$"{speed:F[0-9]}\s*MPH"',  # String interpolation
-                r'(?i)DisplaySpeed\s*=\s*[^;]+speed[^;]*;',  # Speed display assignments
-                
-                # Comments and regions
-                r'(?i)//.*\bspeed\b.*(?:calculation|check|validation)',  # Speed-related comments
-                r'(?i)/\*.*\bspeed\b.*\*/',  # Multi-line comments
-                r'(?i)#region.*\bspeed\b.*#endregion',  # Code regions
-            ]
-            
             logger.info("Starting pattern search")
             
-            # Split into lines and join with line numbers for better context
-            lines = [(i+1, line) for i, line in enumerate(content.split('\n'))]
-            
-            # Initialize analysis
-            self._current_analysis = FixAnalysis()
+            # Every speed pattern and identifier contains "speed" or "mph", so a single
+            # case-insensitive substring search rules out most files before any scanning
+            if not _KW_SPEED.search(content):
+                logger.info("No speed-related terms in file, skipping pattern search")
+                return None
             
-            # Find all matches with context
-            matches = []
-            current_block = None
-            current_block_lines = []
+            # Parse Python sources structurally; everything else goes through the regex scan
+            matches = None
+            if file_path.endswith(".py"):
+                try:
+                    matches = _scan_speed_python(content)
+                except SyntaxError as e:
+                    logger.warning(f"Could not parse {file_path} as Python, falling back to patterns: {e}")
+            if matches is None:
+                matches = _scan_speed_regex(content)
+            matches = _merge_overlapping_blocks(content, matches)
             
-            for line_num, line in lines:
-                # Check if this line starts a new block
-                if any(re.search(pattern, line, re.IGNORECASE) for pattern in speed_patterns):
-                    if current_block:
-                        # Save previous block if it exists
-                        matches.append((current_block, '\n'.join(current_block_lines)))
-                    # Start new block with context
-                    current_block = line_num
-                    current_block_lines = []
-                    # Get context around the line
-                    start = max(0, line_num - 5)
-                    end = min(len(lines), line_num + 6)
-                    context = '\n'.join(line for _, line in lines[start:end])
-                    current_block_lines.append(context)
-                    logger.info(f"Found speed-related code at line {line_num}")
-                    logger.info(f"Context:\n{context}")
-                
-                # Check if we're in a block with braces
-                if current_block and ('{' in line or '}' in line):
-                    current_block_lines.append(line)
-                    # Check if block is complete
-                    block_text = '\n'.join(current_block_lines)
-                    if block_text.count('{') == block_text.count('}') and block_text.count('{') > 0:
-                        matches.append((current_block, block_text))
-                        current_block = None
-                        current_block_lines = []
+            # Start a fresh analysis, carrying over the dependency impacts _process_file recorded
+            previous = self._current_analysis
+            self._current_analysis = FixAnalysis()
+            if previous:
+                self._current_analysis.potential_impacts.extend(previous.potential_impacts)
             
             # Generate fixes for each match
             for line_num, block in matches:
@@ -271,29 +560,7 @@ class CodeFixer:
                     # Look for train speed monitoring patterns
                     if "TrainSpeedMph" in block:
                         logger.info("Found train speed monitoring code")
-                        improved_code = '''double currentSpeed = train.TrainSpeedMph;
-                    // Handle very small speeds (effectively stopped)
-                    if (Math.Abs(currentSpeed) <= 0.01)
-                    {
-                        currentSpeed = 0.0;  // Explicitly set to zero
-                        train.Status = TrainStatus.Stopped;
-                    }
-                    double lastKnownSpeed = lastSpeed.ContainsKey(id) ? lastSpeed[id] : currentSpeed;
-                    lastSpeed[id] = currentSpeed;
-
-                    // Log speed changes
-                    if (Math.Abs(currentSpeed - lastKnownSpeed) > 0.1)  // Only log significant changes
-                    {
-                        string status = currentSpeed == 0.0 ? "stopped" : 
-                                      currentSpeed > lastKnownSpeed ? "accelerating" : "decelerating";
-                        string msg = $"[{simNow:T}] {train.EngineerName} on {train.TrainSymbol} {status} " +
-                                   $"(Speed: {currentSpeed:F1} MPH, Change: {(currentSpeed - lastKnownSpeed):F1} MPH)";
-                        Logger.LogDebug(msg);
-                        if (discordEnabled && (currentSpeed == 0.0 || Math.Abs(currentSpeed - lastKnownSpeed) > 5.0))
-                        {
-                            await discordClient.SendMessage(msg);
-                        }
-                    }'''
+                        improved_code = _IMPROVED_TRAIN_SPEED
                         fix = CodeFix(
                             file_path=file_path,
                             old_code=block,
@@ -323,25 +590,10 @@ class CodeFixer:
                             fix.file_path = file_path
                     
                     if fix:
-                        # Record analysis details
-                        self._current_analysis.testing_steps.extend([
-                            "Test with speed = 0.0",
-                            "Test with speed = 0.01",
-                            "Test with negative speeds",
-                            "Test with very high speeds",
-                            "Verify display formatting"
-                        ])
-                        self._current_analysis.considerations.extend([
-                            "Added proper floating-point comparison",
-                            "Improved error handling",
-                            "Enhanced speed display formatting",
-                            "Added debug logging"
-                        ])
-                        self._current_analysis.potential_impacts.extend([
-                            "Changed speed comparison logic",
-                            "Modified display formatting",
-                            "Added logging statements"
-                        ])
+                        # Record analysis details after the carried-over dependency impacts
+                        self._current_analysis.testing_steps = list(_SPEED_TESTING_STEPS)
+                        self._current_analysis.considerations = list(_SPEED_CONSIDERATIONS)
+                        self._current_analysis.potential_impacts.extend(_SPEED_IMPACTS)
                         return fix
                     
                 except Exception as e:
@@ -356,36 +608,10 @@ class CodeFixer:
     def _generate_improved_speed_calc(self, context: str) -> str:
         """Generates improved speed calculation code."""
         try:
-            # Determine if this is C# code
+            # Treat the context as C# if it looks like it, otherwise emit Python
             is_csharp = "using System" in context or "public" in context
+            return _IMPROVED_BY_LANG["cs" if is_csharp else "py"]
             
-            if is_csharp:
-                # C# version
-                return '''// Check if vehicle is effectively stopped
-if (Math.Abs(speed) <= 0.01f)
-{
-    speed = 0f;  // Explicitly set to zero
-    status = VehicleStatus.Stopped;
-    _displayedSpeed = "Stopped";  // Human-readable status
-    Logger.LogDebug("Vehicle speed below threshold, marked as stopped");
-}
-else
-{
-    _displayedSpeed = $"{speed:F1} MPH";  // One decimal place for non-zero speeds
-    Logger.LogDebug($"Vehicle speed updated to {_displayedSpeed}");
-}'''
-            else:
-                # Python version
-                return '''# Check if vehicle is effectively stopped
-if abs(speed) <= 0.01:
-    speed = 0.0  # Explicitly set to zero
-    status = VehicleStatus.STOPPED
-    displayed_speed = "Stopped"  # Human-readable status
-    logger.debug("Vehicle speed below threshold, marked as stopped")
-else:
-    displayed_speed = f"{speed:.1f} MPH"  # One decimal place for non-zero speeds
-    logger.debug(f"Vehicle speed updated to {displayed_speed}")'''
-                
         except Exception as e:
             logger.error(f"Error generating improved code: {str(e)}")
             return context  # Return original code if we can't improve it
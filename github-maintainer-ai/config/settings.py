@@ -1,8 +1,28 @@
 import os
+from functools import lru_cache
 from dotenv import load_dotenv
 
+@lru_cache(maxsize=1)
+def load_env():
+    """Load the .env file into the environment, once per process."""
+    load_dotenv()
+
+@lru_cache(maxsize=1)
+def get_github_token() -> str:
+    """Get GITHUB_TOKEN, loading .env on first use; raises ValueError if it is not set."""
+    load_env()
+    token = os.getenv("GITHUB_TOKEN")
+    if not token:
+        raise ValueError("GITHUB_TOKEN not found in .env file")
+    return token
+
+@lru_cache(maxsize=1)
 def load_config():
-    """Load configuration from .env file."""
+    """Load configuration from .env file.
+    
+    The result is built once per process and shared by all callers; use
+    ``load_config.cache_clear()`` to pick up changes to the environment.
+    """
     # Load from .env file
     load_dotenv(override=True)
     
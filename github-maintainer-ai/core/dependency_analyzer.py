@@ -1,35 +1,86 @@
-from typing import Dict, List, Optional, Set, Tuple
+from typing import Dict, FrozenSet, Iterable, List, Optional, Set, Tuple
 import re
-from dataclasses import dataclass
+import threading
+from bisect import bisect_left
+from collections import deque
+from concurrent.futures import ThreadPoolExecutor
+from dataclasses import dataclass, field
 from github import Repository
 from loguru import logger
+from core.github_client import GitHubClient
+
+# Symbol definition patterns, compiled once per language. Each match captures the symbol in
+# its last matched group. C# class, method and property definitions share a modifier prefix
+# and are found in one pass; the Python patterns stay separate because their literal
+# prefixes let the regex engine skip ahead faster than a combined alternation can.
+_CS_PATTERNS = (
+    re.compile(r'(?:public|private|protected)\s+'
+               r'(?:(?:class|interface|struct)\s+(\w+)'  # class
+               r'|(?:static\s+)?[\w<>[\]]+\s+(\w+)\s*[({])'),  # method or property
+)
+_PY_PATTERNS = (
+    re.compile(r'class\s+(\w+)'),
+    re.compile(r'def\s+(\w+)'),
+    re.compile(r'^(\w+)\s*=', re.MULTILINE),  # module-level variables
+)
+_EXT_DISPATCH = {'cs': _CS_PATTERNS, 'py': _PY_PATTERNS}
+
+# Dependent-file counts above each threshold move a file into the next risk level
+_RISK_LEVELS = ("low", "medium", "high")
+_RISK_THRESHOLDS = (5, 10)
+
+MAX_SYMBOL_WORKERS = 16  # concurrent file reads in the symbol pass
+MIN_SYMBOL_LENGTH = 3  # shorter symbols cause too many false positives
+_IDENTIFIER = re.compile(r'\w+')
+_PY_IMPORT = re.compile(r'import\s+(\w+)')
 
 @dataclass
 class DependencyInfo:
     file_path: str
-    references: List[str]  # Files that this file references
-    referenced_by: List[str]  # Files that reference this file
-    symbols_defined: Set[str]  # Symbols defined in this file
-    symbols_used: Set[str]  # Symbols used from other files
+    references: Set[str] = field(default_factory=set)  # Files that this file references
+    referenced_by: Set[str] = field(default_factory=set)  # Files that reference this file
+    symbols_defined: Set[str] = field(default_factory=set)  # Symbols defined in this file
+    symbols_used: Set[str] = field(default_factory=set)  # Symbols used from other files
 
 class MultiFileDependencyAnalyzer:
-    def __init__(self, repo: Repository):
+    def __init__(self, repo: Repository, gh: Optional[GitHubClient] = None):
         self.repo = repo
+        self.github_client = gh or GitHubClient.default()
         self.dependency_cache: Dict[str, DependencyInfo] = {}
+        self._symbol_owners: Dict[str, List[str]] = {}
+        self._symbol_prefixes: Set[str] = set()
+        # File contents fetched during one analysis; both passes read every file
+        self._content_cache: Dict[str, Optional[str]] = {}
+        self._content_lock = threading.Lock()
         
     def analyze_dependencies(self, files: List[str]) -> Dict[str, DependencyInfo]:
         """Analyzes dependencies between files."""
         try:
-            # Clear cache for new analysis
+            # Clear caches for new analysis
             self.dependency_cache.clear()
-            
-            # First pass: collect all symbol definitions
-            for file_path in files:
-                self._analyze_file_symbols(file_path)
-            
-            # Second pass: analyze dependencies
-            for file_path in files:
-                self._analyze_file_dependencies(file_path)
+            # Prefetch every file in batched GraphQL requests; anything the batch cannot
+            # return is still read through the contents API in pass one
+            prefetched = self.github_client.batch_get_contents(self.repo.full_name, files)
+            with self._content_lock:
+                self._content_cache.clear()
+                for file_path, raw in prefetched.items():
+                    self._content_cache[file_path] = raw.decode('utf-8')
+            
+            # First pass: collect all symbol definitions. Files are independent and mostly wait
+            # on GitHub, so they run concurrently; results are stored in input order.
+            with ThreadPoolExecutor(max_workers=MAX_SYMBOL_WORKERS) as executor:
+                for file_path, info in zip(files, executor.map(self._analyze_file_symbols, files)):
+                    if info is not None:
+                        self.dependency_cache[file_path] = info
+            
+            # Index symbols by the files defining them so pass two can scan each file once
+            self._symbol_owners = self._build_symbol_index()
+            self._symbol_prefixes = {symbol[:MIN_SYMBOL_LENGTH] for symbol in self._symbol_owners}
+            
+            # Second pass: analyze dependencies (nothing to find without usable symbols)
+            if self._symbol_owners:
+                for file_path in files:
+                    self._analyze_file_dependencies(file_path)
             
             # Return relevant subset of dependency cache
             return {f: self.dependency_cache[f] for f in files if f in self.dependency_cache}
@@ -38,62 +89,28 @@ class MultiFileDependencyAnalyzer:
             logger.error(f"Error analyzing dependencies: {e}")
             return {}
     
-    def _analyze_file_symbols(self, file_path: str):
+    def _analyze_file_symbols(self, file_path: str) -> Optional[DependencyInfo]:
         """Analyzes symbols defined in a file."""
         try:
             content = self._get_file_content(file_path)
             if not content:
-                return
+                return None
             
             # Initialize dependency info
-            info = DependencyInfo(
-                file_path=file_path,
-                references=[],
-                referenced_by=[],
-                symbols_defined=set(),
-                symbols_used=set()
-            )
+            info = DependencyInfo(file_path=file_path)
             
             # Look for symbol definitions based on file type
             ext = file_path.split('.')[-1].lower()
+            # Unknown extensions define nothing but are still cached, since they can use symbols
+            for pattern in _EXT_DISPATCH.get(ext, ()):
+                for match in pattern.finditer(content):
+                    info.symbols_defined.add(match[match.lastindex])
             
-            if ext in ['cs']:  # C# files
-                # Find class definitions
-                class_matches = re.finditer(r'(?:public|private|protected)\s+(?:class|interface|struct)\s+(\w+)', content)
-                for match in class_matches:
-                    info.symbols_defined.add(match.group(1))
-                
-                # Find method definitions
-                method_matches = re.finditer(r'(?:public|private|protected)\s+(?:static\s+)?[\w<>[\]]+\s+(\w+)\s*\(', content)
-                for match in method_matches:
-                    info.symbols_defined.add(match.group(1))
-                
-                # Find property definitions
-                prop_matches = re.finditer(r'(?:public|private|protected)\s+(?:static\s+)?[\w<>[\]]+\s+(\w+)\s*\{', content)
-                for match in prop_matches:
-                    info.symbols_defined.add(match.group(1))
-                
-            elif ext in ['py']:  # Python files
-                # Find class definitions
-                class_matches = re.finditer(r'class\s+(\w+)', content)
-                for match in class_matches:
-                    info.symbols_defined.add(match.group(1))
-                
-                # Find function definitions
-                func_matches = re.finditer(r'def\s+(\w+)', content)
-                for match in func_matches:
-                    info.symbols_defined.add(match.group(1))
-                
-                # Find variable definitions at module level
-                var_matches = re.finditer(r'^(\w+)\s*=', content, re.MULTILINE)
-                for match in var_matches:
-                    info.symbols_defined.add(match.group(1))
-            
-            # Store in cache
-            self.dependency_cache[file_path] = info
+            return info
             
         except Exception as e:
             logger.error(f"Error analyzing symbols in {file_path}: {e}")
+            return None
     
     def _analyze_file_dependencies(self, file_path: str):
         """Analyzes dependencies between files."""
@@ -108,61 +125,72 @@ class MultiFileDependencyAnalyzer:
             info = self.dependency_cache[file_path]
             ext = file_path.split('.')[-1].lower()
             
-            # Look for symbol usage
-            for other_file, other_info in self.dependency_cache.items():
-                if other_file == file_path:
-                    continue
-                
-                # Check for usage of symbols from other file
-                for symbol in other_info.symbols_defined:
-                    # Skip very short symbols to avoid false positives
-                    if len(symbol) < 3:
+            # \bsymbol\b holds exactly when the symbol is a whole identifier in the file, so a
+            # single tokenizing pass replaces a regex search per symbol. The C# usage patterns
+            # (new X, : X, <X>) only match where \bX\b does.
+            candidates = set(_IDENTIFIER.findall(content))
+            if ext in ['py']:  # Python files
+                # `import X` also matches when X is only a prefix of the imported name;
+                # names no symbol starts like cannot contribute one
+                for match in _PY_IMPORT.finditer(content):
+                    name = match.group(1)
+                    if name[:MIN_SYMBOL_LENGTH] in self._symbol_prefixes:
+                        candidates.update(name[:i] for i in range(MIN_SYMBOL_LENGTH, len(name)))
+            
+            # Look for usage of symbols from other files
+            for symbol in candidates.intersection(self._symbol_owners):
+                for other_file in self._symbol_owners[symbol]:
+                    if other_file == file_path:
                         continue
-                        
-                    # Look for usage patterns based on file type
-                    if ext in ['cs']:  # C# files
-                        patterns = [
-                            rf'\b{symbol}\b',  # Direct usage
-                            rf'new\s+{symbol}\b',  # Object creation
-                            rf':\s*{symbol}\b',  # Inheritance
-                            rf'<\s*{symbol}\s*>',  # Generic type
-                        ]
-                    elif ext in ['py']:  # Python files
-                        patterns = [
-                            rf'\b{symbol}\b',  # Direct usage
-                            rf'from\s+\w+\s+import\s+{symbol}',  # Import
-                            rf'import\s+{symbol}',  # Direct import
-                        ]
-                    else:
-                        patterns = [rf'\b{symbol}\b']  # Default pattern
-                    
-                    # Check each pattern
-                    for pattern in patterns:
-                        if re.search(pattern, content):
-                            info.symbols_used.add(symbol)
-                            info.references.append(other_file)
-                            other_info.referenced_by.append(file_path)
-                            break
+                    info.symbols_used.add(symbol)
+                    info.references.add(other_file)
+                    self.dependency_cache[other_file].referenced_by.add(file_path)
             
         except Exception as e:
             logger.error(f"Error analyzing dependencies in {file_path}: {e}")
     
+    def _build_symbol_index(self) -> Dict[str, List[str]]:
+        """Maps each symbol to the files that define it, skipping very short symbols."""
+        owners: Dict[str, List[str]] = {}
+        for file_path, info in self.dependency_cache.items():
+            for symbol in info.symbols_defined:
+                # Skip very short symbols to avoid false positives
+                if len(symbol) >= MIN_SYMBOL_LENGTH:
+                    owners.setdefault(symbol, []).append(file_path)
+        return owners
+    
     def _get_file_content(self, file_path: str) -> Optional[str]:
-        """Gets file content from repository."""
+        """Gets file content from repository, fetching each path at most once per analysis."""
+        with self._content_lock:
+            if file_path in self._content_cache:
+                return self._content_cache[file_path]
+        
         try:
             file_content = self.repo.get_contents(file_path)
-            return file_content.decoded_content.decode('utf-8')
+            content = file_content.decoded_content.decode('utf-8')
         except Exception as e:
             logger.error(f"Error reading file {file_path}: {e}")
-            return None
+            content = None
+        
+        with self._content_lock:
+            self._content_cache[file_path] = content
+        return content
+    
+    def get_cached_contents(self, paths: Iterable[str]) -> Dict[str, bytes]:
+        """Returns the UTF-8 contents of the given paths that the last analysis read."""
+        with self._content_lock:
+            return {
+                path: self._content_cache[path].encode('utf-8')
+                for path in paths if self._content_cache.get(path) is not None
+            }
     
-    def get_affected_files(self, primary_files: List[str]) -> List[str]:
-        """Gets the full list of files that might need to be modified."""
+    def get_affected_files(self, primary_files: List[str]) -> FrozenSet[str]:
+        """Gets the full, de-duplicated set of files that might need to be modified."""
         affected = set(primary_files)
-        to_process = list(primary_files)
+        to_process = deque(primary_files)
         
         while to_process:
-            current = to_process.pop(0)
+            current = to_process.popleft()
             if current not in self.dependency_cache:
                 continue
             
@@ -180,7 +208,7 @@ class MultiFileDependencyAnalyzer:
                     affected.add(ref)
                     to_process.append(ref)
         
-        return list(affected)
+        return frozenset(affected)
     
     def analyze_change_impact(self, files: List[str]) -> Dict[str, Dict]:
         """Analyzes the potential impact of changes to the given files."""
@@ -191,8 +219,8 @@ class MultiFileDependencyAnalyzer:
                 
             info = self.dependency_cache[file_path]
             impacts[file_path] = {
-                "direct_dependencies": info.references,
-                "dependent_files": info.referenced_by,
+                "direct_dependencies": sorted(info.references),
+                "dependent_files": sorted(info.referenced_by),
                 "symbols_affected": list(info.symbols_defined),
                 "risk_level": self._calculate_risk_level(info)
             }
@@ -201,9 +229,5 @@ class MultiFileDependencyAnalyzer:
     
     def _calculate_risk_level(self, info: DependencyInfo) -> str:
         """Calculates risk level based on dependencies."""
-        ref_count = len(info.referenced_by)
-        if ref_count > 10:
-            return "high"
-        elif ref_count > 5:
-            return "medium"
-        return "low"
+        # bisect_left keeps the bands exclusive: more than 5 is medium, more than 10 is high
+        return _RISK_LEVELS[bisect_left(_RISK_THRESHOLDS, len(info.referenced_by))]
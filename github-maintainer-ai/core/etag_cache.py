@@ -0,0 +1,42 @@
+from typing import Optional, Tuple
+import os
+import sqlite3
+import threading
+import time
+
+class ETagCache:
+    """SQLite-backed store of HTTP response bodies and their ETags, keyed by URL."""
+
+    def __init__(self, path: str = ".cache/github_cache.sqlite"):
+        self.path = path
+        directory = os.path.dirname(path)
+        if directory:
+            os.makedirs(directory, exist_ok=True)
+
+        self._lock = threading.Lock()
+        self._conn = sqlite3.connect(path, check_same_thread=False)
+        with self._conn:
+            self._conn.execute(
+                "CREATE TABLE IF NOT EXISTS cache ("
+                "url TEXT PRIMARY KEY, etag TEXT, body BLOB, fetched_at REAL)"
+            )
+
+    def get(self, url: str) -> Optional[Tuple[Optional[str], bytes, float]]:
+        """Returns ``(etag, body, fetched_at)`` for a cached URL, or None."""
+        with self._lock:
+            return self._conn.execute(
+                "SELECT etag, body, fetched_at FROM cache WHERE url = ?", (url,)
+            ).fetchone()
+
+    def set(self, url: str, etag: Optional[str], body: bytes):
+        """Stores a freshly fetched response body."""
+        with self._lock, self._conn:
+            self._conn.execute(
+                "INSERT OR REPLACE INTO cache (url, etag, body, fetched_at) VALUES (?, ?, ?, ?)",
+                (url, etag, body, time.time())
+            )
+
+    def touch(self, url: str):
+        """Marks a cached entry as revalidated (e.g. after a 304 Not Modified)."""
+        with self._lock, self._conn:
+            self._conn.execute("UPDATE cache SET fetched_at = ? WHERE url = ?", (time.time(), url))
@@ -1,6 +1,24 @@
 import os
 import json
-from typing import Dict, Any
+from typing import Dict, Any, Iterator, Union
+
+try:
+    import orjson
+except ImportError:  # optional speedup; stdlib json writes the same documents
+    orjson = None
+
+def json_dumps(data: Any, indent: bool = False) -> bytes:
+    """Serialize data to UTF-8 JSON, with orjson when it is installed."""
+    if orjson is not None:
+        option = orjson.OPT_NON_STR_KEYS | (orjson.OPT_INDENT_2 if indent else 0)
+        return orjson.dumps(data, option=option)
+    return json.dumps(data, indent=2 if indent else None).encode('utf-8')
+
+def json_loads(raw: Union[bytes, str]) -> Any:
+    """Parse a JSON document, with orjson when it is installed."""
+    if orjson is not None:
+        return orjson.loads(raw)
+    return json.loads(raw)
 
 class FileUtils:
     @staticmethod
@@ -38,3 +56,25 @@ class FileUtils:
         except Exception as e:
             print(f"Error appending to JSON file {file_path}: {e}")
             return False
+    
+    @staticmethod
+    def append_jsonl(file_path: str, data: Dict) -> bool:
+        """Append one record to a JSON-lines file without rewriting it."""
+        try:
+            directory = os.path.dirname(file_path)
+            if directory:
+                os.makedirs(directory, exist_ok=True)
+            with open(file_path, 'ab') as f:
+                f.write(json_dumps(data) + b'\n')
+            return True
+        except Exception as e:
+            print(f"Error appending to JSONL file {file_path}: {e}")
+            return False
+    
+    @staticmethod
+    def read_jsonl(file_path: str) -> Iterator[Dict]:
+        """Yield the records of a JSON-lines file, skipping blank lines."""
+        with open(file_path, 'rb') as f:
+            for line in f:
+                if line.strip():
+                    yield json_loads(line)
@@ -1,10 +1,68 @@
-from typing import Dict, List
+from typing import Any, Dict, Iterable, List, Optional
+import json
 import os
-from github import Github
+import threading
+import time
+import requests
+from requests.adapters import HTTPAdapter
+from urllib3.util import Retry
+from github import Auth, Github
 from github.Repository import Repository
 from loguru import logger
+from core.etag_cache import ETagCache
+
+API_URL = "https://api.github.com"
+GRAPHQL_URL = "https://api.github.com/graphql"
+GRAPHQL_BATCH_SIZE = 50  # aliases per query, keeps us well under GraphQL complexity limits
+OBJECT_TTL = 30 * 24 * 3600  # Git objects fetched by SHA never change, so cached ones stay valid
+RAW_MEDIA_TYPE = "application/vnd.github.raw"
+POOL_SIZE = 32  # keep-alive connections per host, enough for the concurrent file readers
+RATE_LIMIT_RESERVE = 50  # REST requests to have left before starting work on an issue
+
+_ISSUES_QUERY = """
+query($owner: String!, $name: String!, $cursor: String, $states: [IssueState!], $since: DateTime) {
+  repository(owner: $owner, name: $name) {
+    issues(first: 100, after: $cursor, states: $states,
+           orderBy: {field: UPDATED_AT, direction: DESC}, filterBy: {since: $since}) {
+      pageInfo { endCursor hasNextPage }
+      nodes { number title body state updatedAt labels(first: 20) { nodes { name } } }
+    }
+  }
+}
+"""
+
+_DEFAULT_BRANCH_QUERY = """
+query($owner: String!, $name: String!) {
+  repository(owner: $owner, name: $name) {
+    name
+    defaultBranchRef { name target { oid } }
+  }
+}
+"""
+
+def _build_session() -> requests.Session:
+    """Create the HTTP session shared by every raw GitHub request in the process."""
+    session = requests.Session()
+    retries = Retry(total=5, backoff_factor=0.3, status_forcelist=[502, 503, 504])
+    session.mount("https://", HTTPAdapter(pool_connections=10, pool_maxsize=POOL_SIZE, max_retries=retries))
+    session.headers["Accept"] = "application/vnd.github+json"
+    return session
+
+# One pooled session so keep-alive connections are reused across clients and helpers
+_session = _build_session()
 
 class GitHubClient:
+    _default = None
+    _default_lock = threading.Lock()
+
+    @classmethod
+    def default(cls) -> "GitHubClient":
+        """Get the process-wide client, creating it on first use."""
+        with cls._default_lock:
+            if cls._default is None:
+                cls._default = cls()
+            return cls._default
+
     def __init__(self):
         """Initialize GitHub client with token from environment variables."""
         self.token = os.getenv("GITHUB_TOKEN")
@@ -14,14 +72,20 @@ class GitHubClient:
         
         logger.info("Initializing GitHub client...")
         try:
-            self.client = Github(self.token)
-            # Test the token by getting the authenticated user
-            user = self.client.get_user()
-            logger.info(f"Successfully authenticated as: {user.login}")
+            # PyGithub keeps its own session; size its pool like ours so parallel calls reuse connections
+            self.client = Github(auth=Auth.Token(self.token), per_page=100, pool_size=POOL_SIZE)
+            # Test the token by getting the authenticated user, keeping its login for later use
+            self.login = self.client.get_user().login
+            logger.info(f"Successfully authenticated as: {self.login}")
         except Exception as e:
             logger.error(f"Failed to initialize GitHub client: {e}")
             raise
 
+        # Raw REST requests for endpoints served through the ETag cache
+        self._session = _session
+        self._auth_headers = {"Authorization": f"token {self.token}"}
+        self._cache = ETagCache(os.getenv("GITHUB_CACHE_PATH", ".cache/github_cache.sqlite"))
+
     def get_repository(self, owner: str, name: str) -> Repository:
         """Get the GitHub repository instance by owner and name."""
         try:
@@ -30,3 +94,229 @@ class GitHubClient:
         except Exception as e:
             logger.error(f"Failed to access repository {owner}/{name}: {e}")
             raise
+
+    def wait_for_rate_limit(self, min_remaining: int = RATE_LIMIT_RESERVE):
+        """Sleep until the REST quota has at least ``min_remaining`` requests left.
+
+        Reading ``/rate_limit`` does not count against the quota, so checking first
+        avoids starting work that would fail halfway with a 403.
+        """
+        try:
+            response = self._session.get(f"{API_URL}/rate_limit", headers=self._auth_headers, timeout=30)
+            response.raise_for_status()
+            core = response.json()["resources"]["core"]
+        except Exception as e:
+            logger.error(f"Failed to check the GitHub rate limit: {e}")
+            return
+
+        if core["remaining"] < min_remaining:
+            delay = max(core["reset"] - time.time(), 0) + 1
+            logger.warning(f"GitHub rate limit low ({core['remaining']} left), waiting {delay:.0f}s for the reset")
+            time.sleep(delay)
+
+    def get_json(self, path: str, params: Optional[Dict] = None, ttl: int = 0) -> Any:
+        """GET a REST endpoint through the ETag cache.
+
+        Bodies fetched less than ``ttl`` seconds ago are returned without a request.
+        Older ones are revalidated with ``If-None-Match``, so an unchanged resource
+        costs a 304 that does not count against the rate limit.
+        """
+        return json.loads(self._get_cached(path, params, ttl))
+
+    def get_blob(self, full_name: str, sha: str) -> bytes:
+        """Get the content of a Git blob, served from the cache once it has been fetched.
+
+        The raw media type returns the bytes themselves instead of a base64 JSON
+        envelope, a third less to download and nothing to decode.
+        """
+        return self._get_cached(f"repos/{full_name}/git/blobs/{sha}", ttl=OBJECT_TTL, accept=RAW_MEDIA_TYPE)
+
+    def _get_cached(self, path: str, params: Optional[Dict] = None, ttl: int = 0,
+                    accept: Optional[str] = None) -> bytes:
+        """GET a REST endpoint through the ETag cache and return the response body.
+
+        Responses requested in another media type are cached under their own key.
+        """
+        url = requests.Request("GET", f"{API_URL}/{path.lstrip('/')}", params=params).prepare().url
+        key = f"{url}#{accept}" if accept else url
+        cached = self._cache.get(key)
+        headers = dict(self._auth_headers)
+        if accept:
+            headers["Accept"] = accept
+        if cached:
+            etag, body, fetched_at = cached
+            if time.time() - fetched_at < ttl:
+                return body
+            if etag:
+                headers["If-None-Match"] = etag
+
+        response = self._session.get(url, headers=headers, timeout=30)
+        if response.status_code == 304 and cached:
+            self._cache.touch(key)
+            return cached[1]
+        response.raise_for_status()
+        self._cache.set(key, response.headers.get("ETag"), response.content)
+        return response.content
+
+    def get_open_issues(self, owner: str, name: str, ttl: int = 60) -> List[Dict]:
+        """Get the open issues of a repository, excluding pull requests."""
+        issues = self.get_json(f"repos/{owner}/{name}/issues", {"state": "open", "per_page": 100}, ttl=ttl)
+        return [
+            {
+                "id": issue["number"],
+                "title": issue["title"],
+                "body": issue["body"] or "",
+                "labels": [label["name"] for label in issue["labels"]]
+            }
+            for issue in issues
+            if "pull_request" not in issue
+        ]
+
+    def graphql(self, query: str, variables: Optional[Dict] = None, allow_partial: bool = False) -> Dict:
+        """Run a GraphQL query and return its ``data`` object.
+
+        With ``allow_partial``, errors that still came with data (e.g. NOT_FOUND for
+        one alias of a batched query) are logged and the partial data is returned.
+        """
+        response = self._session.post(
+            GRAPHQL_URL,
+            json={"query": query, "variables": variables or {}},
+            headers=self._auth_headers,
+            timeout=30
+        )
+        response.raise_for_status()
+        payload = response.json()
+        errors = payload.get("errors")
+        if errors:
+            if not (allow_partial and payload.get("data")):
+                raise RuntimeError(f"GraphQL query failed: {errors}")
+            logger.warning(f"GraphQL query returned {len(errors)} errors, keeping the partial data")
+        return payload["data"]
+
+    def graphql_default_branch(self, owner: str, name: str, ttl: int = 0) -> Dict:
+        """Get a repository's name, default branch and that branch's HEAD commit in one request.
+
+        A result fetched less than ``ttl`` seconds ago is returned from the cache
+        without a request.
+        """
+        key = f"graphql:default_branch:{owner}/{name}"
+        cached = self._cache.get(key)
+        if cached and time.time() - cached[2] < ttl:
+            return json.loads(cached[1])
+
+        repository = self.graphql(_DEFAULT_BRANCH_QUERY, {"owner": owner, "name": name})["repository"]
+        branch = repository["defaultBranchRef"]
+        info = {"name": repository["name"], "default_branch": branch["name"], "sha": branch["target"]["oid"]}
+        self._cache.set(key, None, json.dumps(info).encode("utf-8"))
+        return info
+
+    def graphql_open_issues(self, owner: str, name: str) -> List[Dict]:
+        """Get the open issues of a repository, fetching only what changed since the last call.
+
+        The open-issue snapshot is kept in the ETag cache together with the newest
+        ``updatedAt`` seen, so steady-state calls only page through issues updated
+        (or closed) since then.
+        """
+        key = f"graphql:open_issues:{owner}/{name}"
+        cached = self._cache.get(key)
+        # For this entry the etag column holds the last-seen updatedAt timestamp
+        since, snapshot = (cached[0], json.loads(cached[1])) if cached else (None, {})
+        last_seen_at = since
+
+        variables = {
+            "owner": owner,
+            "name": name,
+            "cursor": None,
+            # Closed issues only matter on incremental runs, to drop them from the snapshot
+            "states": ["OPEN", "CLOSED"] if since else ["OPEN"],
+            "since": since
+        }
+        while True:
+            issues = self.graphql(_ISSUES_QUERY, variables)["repository"]["issues"]
+            for node in issues["nodes"]:
+                if node["state"] == "OPEN":
+                    snapshot[str(node["number"])] = {
+                        "id": node["number"],
+                        "title": node["title"],
+                        "body": node["body"] or "",
+                        "labels": [label["name"] for label in node["labels"]["nodes"]]
+                    }
+                else:
+                    snapshot.pop(str(node["number"]), None)
+                if last_seen_at is None or node["updatedAt"] > last_seen_at:
+                    last_seen_at = node["updatedAt"]
+            if not issues["pageInfo"]["hasNextPage"]:
+                break
+            variables["cursor"] = issues["pageInfo"]["endCursor"]
+
+        self._cache.set(key, last_seen_at, json.dumps(snapshot).encode("utf-8"))
+        logger.info(f"Fetched open issues for {owner}/{name} ({len(snapshot)} open)")
+        return list(snapshot.values())
+
+    def graphql_issue_comments(self, owner: str, name: str, numbers: Iterable[int]) -> Dict[int, List[str]]:
+        """Get the comment bodies of several issues with one GraphQL request per batch.
+
+        Issues with more comments than a single page holds, or whose batch failed,
+        are left out so callers can fall back to ``issue.get_comments()``.
+        """
+        numbers = list(numbers)
+        comments = {}
+        for offset in range(0, len(numbers), GRAPHQL_BATCH_SIZE):
+            batch = numbers[offset:offset + GRAPHQL_BATCH_SIZE]
+            fields = "\n".join(
+                f"i{number}: issue(number: {int(number)}) {{ comments(first: 100) {{ totalCount nodes {{ body }} }} }}"
+                for number in batch
+            )
+            query = f"query($owner: String!, $name: String!) {{ repository(owner: $owner, name: $name) {{ {fields} }} }}"
+            try:
+                # A number that is not an issue (e.g. a pull request) only nulls its own alias
+                repository = self.graphql(query, {"owner": owner, "name": name}, allow_partial=True)["repository"]
+            except Exception as e:
+                logger.error(f"Failed to fetch issue comments for {owner}/{name}: {e}")
+                continue
+            if repository is None:
+                # Missing or not visible to the token; every later batch would be too
+                logger.warning(f"Repository {owner}/{name} not found via GraphQL, leaving comments to REST")
+                break
+
+            for number in batch:
+                issue = repository.get(f"i{number}")
+                if issue and issue["comments"]["totalCount"] <= len(issue["comments"]["nodes"]):
+                    comments[number] = [node["body"] for node in issue["comments"]["nodes"]]
+
+        logger.info(f"Fetched comments for {len(comments)}/{len(numbers)} issues via GraphQL")
+        return comments
+
+    def batch_get_contents(self, full_name: str, paths: Iterable[str], ref: str = "HEAD") -> Dict[str, bytes]:
+        """Fetch the contents of several files with one GraphQL request per batch.
+
+        Paths that are missing, binary or truncated by the GraphQL blob API are left
+        out of the result so callers can fall back to ``repo.get_contents``.
+        """
+        paths = list(paths)
+        if not paths:
+            return {}
+
+        owner, name = full_name.split("/", 1)
+        contents = {}
+        for offset in range(0, len(paths), GRAPHQL_BATCH_SIZE):
+            batch = paths[offset:offset + GRAPHQL_BATCH_SIZE]
+            fields = "\n".join(
+                f"f{i}: object(expression: {json.dumps(f'{ref}:{path}')}) {{ ... on Blob {{ text isBinary isTruncated }} }}"
+                for i, path in enumerate(batch)
+            )
+            query = f"query($owner: String!, $name: String!) {{ repository(owner: $owner, name: $name) {{ {fields} }} }}"
+            try:
+                # A missing path only nulls its own alias
+                repository = self.graphql(query, {"owner": owner, "name": name}, allow_partial=True)["repository"] or {}
+            except Exception as e:
+                logger.error(f"Failed to batch fetch contents from {full_name}: {e}")
+                continue
+
+            for i, path in enumerate(batch):
+                blob = repository.get(f"f{i}")
+                if blob and blob.get("text") is not None and not blob.get("isBinary") and not blob.get("isTruncated"):
+                    contents[path] = blob["text"].encode("utf-8")
+
+        logger.info(f"Fetched {len(contents)}/{len(paths)} files via GraphQL")
+        return contents
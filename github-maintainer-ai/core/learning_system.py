@@ -1,51 +1,127 @@
-from typing import Dict, List, Optional
-import json
+from typing import Dict, FrozenSet, List, Optional
+import atexit
 import os
+import threading
 from datetime import datetime
 from loguru import logger
+from core.file_utils import FileUtils, json_dumps, json_loads
+
+# Learned patterns are rewritten as a whole, so they are saved every this many fixes
+SAVE_INTERVAL = 50
 
 class LearningSystem:
     def __init__(self, memory_dir: str = "./memory"):
         self.memory_dir = memory_dir
-        self.fixes_memory_path = os.path.join(memory_dir, "learned_fixes.json")
+        # Fix records are append-only, so they live in a JSON-lines file
+        self.fixes_memory_path = os.path.join(memory_dir, "learned_fixes.jsonl")
+        self.legacy_fixes_memory_path = os.path.join(memory_dir, "learned_fixes.json")
         self.patterns_memory_path = os.path.join(memory_dir, "learned_patterns.json")
-        self._load_memory()
+        
+        # Memory is parsed on first use. The lock keeps the learning thread and callers
+        # from loading it twice, and readers from seeing the memory mid-update.
+        self._fixes_memory: Optional[List[Dict]] = None
+        self._patterns_memory: Optional[Dict] = None
+        self._lock = threading.RLock()
+        # Word sets of each learned issue, kept parallel to fixes_memory for similarity lookups,
+        # and an inverted index from word to the successful fixes whose issue contains it
+        self._fix_word_sets: List[FrozenSet[str]] = []
+        self._word_index: Dict[str, List[int]] = {}
+        
+        # Unsaved pattern updates; flushed every SAVE_INTERVAL fixes and at exit
+        self._unsaved = 0
+        atexit.register(self.flush)
+
+        # Convert fixes saved before the JSON-lines format now: the first learned fix
+        # creates the new log, after which the old file would never be read again
+        if os.path.exists(self.legacy_fixes_memory_path) and not os.path.exists(self.fixes_memory_path):
+            try:
+                self._migrate_legacy_fixes()
+            except Exception as e:
+                logger.error(f"Error migrating memory: {e}")
+
+    def __enter__(self):
+        return self
+
+    def __exit__(self, exc_type, exc_value, traceback):
+        self.flush()
+
+    @property
+    def fixes_memory(self) -> List[Dict]:
+        """Every recorded fix attempt, loaded from disk on first access."""
+        if self._fixes_memory is None:
+            with self._lock:
+                if self._fixes_memory is None:
+                    self._load_fixes()
+        return self._fixes_memory
+
+    @property
+    def patterns_memory(self) -> Dict:
+        """Learned file, code and strategy statistics, loaded from disk on first access."""
+        if self._patterns_memory is None:
+            with self._lock:
+                if self._patterns_memory is None:
+                    self._load_patterns()
+        return self._patterns_memory
+
+    def flush(self):
+        """Write any pattern updates that have not been saved yet."""
+        with self._lock:
+            if self._unsaved:
+                self._save_memory()
+                self._unsaved = 0
 
-    def _load_memory(self):
-        """Load learned patterns and fixes from disk."""
+    @staticmethod
+    def _empty_patterns() -> Dict:
+        return {
+            "file_patterns": {},
+            "code_patterns": {},
+            "fix_strategies": {}
+        }
+
+    def _load_fixes(self):
+        """Load learned fixes from disk and index them for similarity lookups."""
         try:
             if os.path.exists(self.fixes_memory_path):
-                with open(self.fixes_memory_path, 'r') as f:
-                    self.fixes_memory = json.load(f)
+                fixes = list(FileUtils.read_jsonl(self.fixes_memory_path))
             else:
-                self.fixes_memory = []
+                fixes = []
+        except Exception as e:
+            logger.error(f"Error loading memory: {e}")
+            fixes = []
+        
+        for fix in fixes:
+            self._index_fix(fix)
+        self._fixes_memory = fixes
 
+    def _load_patterns(self):
+        """Load learned patterns from disk."""
+        try:
             if os.path.exists(self.patterns_memory_path):
-                with open(self.patterns_memory_path, 'r') as f:
-                    self.patterns_memory = json.load(f)
+                with open(self.patterns_memory_path, 'rb') as f:
+                    self._patterns_memory = json_loads(f.read())
             else:
-                self.patterns_memory = {
-                    "file_patterns": {},
-                    "code_patterns": {},
-                    "fix_strategies": {}
-                }
+                self._patterns_memory = self._empty_patterns()
         except Exception as e:
             logger.error(f"Error loading memory: {e}")
-            self.fixes_memory = []
-            self.patterns_memory = {
-                "file_patterns": {},
-                "code_patterns": {},
-                "fix_strategies": {}
-            }
+            self._patterns_memory = self._empty_patterns()
+
+    def _migrate_legacy_fixes(self):
+        """Converts fixes saved as one JSON array into the JSON-lines format."""
+        with open(self.legacy_fixes_memory_path, 'rb') as f:
+            fixes = json_loads(f.read())
+        # Write the whole log before it appears, so a failed migration is retried next time
+        tmp_path = self.fixes_memory_path + ".tmp"
+        with open(tmp_path, 'wb') as f:
+            f.writelines(json_dumps(fix) + b'\n' for fix in fixes)
+        os.replace(tmp_path, self.fixes_memory_path)
+        logger.info(f"Migrated {len(fixes)} learned fixes to {self.fixes_memory_path}")
 
     def _save_memory(self):
-        """Save learned patterns and fixes to disk."""
+        """Save learned patterns to disk (fixes are appended as they are learned)."""
         try:
             os.makedirs(self.memory_dir, exist_ok=True)
-            with open(self.fixes_memory_path, 'w') as f:
-                json.dump(self.fixes_memory, f, indent=2)
-            with open(self.patterns_memory_path, 'w') as f:
-                json.dump(self.patterns_memory, f, indent=2)
+            with open(self.patterns_memory_path, 'wb') as f:
+                f.write(json_dumps(self.patterns_memory, indent=True))
         except Exception as e:
             logger.error(f"Error saving memory: {e}")
 
@@ -66,47 +142,54 @@ class LearningSystem:
                 "patterns_identified": fix_data.get("patterns_found", []),
                 "fix_strategy": fix_data.get("strategy", "")
             }
-            self.fixes_memory.append(fix_record)
-
-            # Update pattern recognition
-            for file in files:
-                ext = os.path.splitext(file)[1]
-                if ext not in self.patterns_memory["file_patterns"]:
-                    self.patterns_memory["file_patterns"][ext] = {"count": 0, "issues": {}}
-                self.patterns_memory["file_patterns"][ext]["count"] += 1
+            with self._lock:
+                FileUtils.append_jsonl(self.fixes_memory_path, fix_record)
+                # Unloaded fixes will be read back from the log, including this one
+                if self._fixes_memory is not None:
+                    self._fixes_memory.append(fix_record)
+                    self._index_fix(fix_record)
+
+                # Update pattern recognition
+                for file in files:
+                    ext = os.path.splitext(file)[1]
+                    if ext not in self.patterns_memory["file_patterns"]:
+                        self.patterns_memory["file_patterns"][ext] = {"count": 0, "issues": {}}
+                    self.patterns_memory["file_patterns"][ext]["count"] += 1
                 
-                # Track issue types per file extension
-                for label in issue_data.get("labels", []):
-                    if label not in self.patterns_memory["file_patterns"][ext]["issues"]:
-                        self.patterns_memory["file_patterns"][ext]["issues"][label] = 0
-                    self.patterns_memory["file_patterns"][ext]["issues"][label] += 1
-
-            # Learn from code patterns
-            for pattern in fix_data.get("patterns_found", []):
-                if pattern not in self.patterns_memory["code_patterns"]:
-                    self.patterns_memory["code_patterns"][pattern] = {
-                        "count": 0,
-                        "success_count": 0,
-                        "related_patterns": {}
-                    }
-                self.patterns_memory["code_patterns"][pattern]["count"] += 1
-                if success:
-                    self.patterns_memory["code_patterns"][pattern]["success_count"] += 1
-
-            # Learn fix strategies
-            strategy = fix_data.get("strategy", "")
-            if strategy:
-                if strategy not in self.patterns_memory["fix_strategies"]:
-                    self.patterns_memory["fix_strategies"][strategy] = {
-                        "count": 0,
-                        "success_count": 0,
-                        "related_issues": {}
-                    }
-                self.patterns_memory["fix_strategies"][strategy]["count"] += 1
-                if success:
-                    self.patterns_memory["fix_strategies"][strategy]["success_count"] += 1
-
-            self._save_memory()
+                    # Track issue types per file extension
+                    for label in issue_data.get("labels", []):
+                        if label not in self.patterns_memory["file_patterns"][ext]["issues"]:
+                            self.patterns_memory["file_patterns"][ext]["issues"][label] = 0
+                        self.patterns_memory["file_patterns"][ext]["issues"][label] += 1
+
+                # Learn from code patterns
+                for pattern in fix_data.get("patterns_found", []):
+                    if pattern not in self.patterns_memory["code_patterns"]:
+                        self.patterns_memory["code_patterns"][pattern] = {
+                            "count": 0,
+                            "success_count": 0,
+                            "related_patterns": {}
+                        }
+                    self.patterns_memory["code_patterns"][pattern]["count"] += 1
+                    if success:
+                        self.patterns_memory["code_patterns"][pattern]["success_count"] += 1
+
+                # Learn fix strategies
+                strategy = fix_data.get("strategy", "")
+                if strategy:
+                    if strategy not in self.patterns_memory["fix_strategies"]:
+                        self.patterns_memory["fix_strategies"][strategy] = {
+                            "count": 0,
+                            "success_count": 0,
+                            "related_issues": {}
+                        }
+                    self.patterns_memory["fix_strategies"][strategy]["count"] += 1
+                    if success:
+                        self.patterns_memory["fix_strategies"][strategy]["success_count"] += 1
+
+                self._unsaved += 1
+                if self._unsaved >= SAVE_INTERVAL:
+                    self.flush()
             logger.info(f"Learned from fix attempt: {success}")
         except Exception as e:
             logger.error(f"Error learning from fix: {e}")
@@ -120,57 +203,64 @@ class LearningSystem:
                 "strategy_suggestions": []
             }
 
-            # Check file patterns
-            for file in files:
-                ext = os.path.splitext(file)[1]
-                if ext in self.patterns_memory["file_patterns"]:
-                    pattern = self.patterns_memory["file_patterns"][ext]
-                    if pattern["count"] > 0:
-                        common_issues = sorted(
-                            pattern["issues"].items(),
-                            key=lambda x: x[1],
-                            reverse=True
-                        )[:3]
-                        suggestions["file_suggestions"].append({
-                            "file_type": ext,
-                            "frequency": pattern["count"],
-                            "common_issues": common_issues
-                        })
-
-            # Find similar successful fixes
-            similar_fixes = []
-            for fix in self.fixes_memory:
-                if fix["success"]:
+            with self._lock:
+                # Check file patterns
+                for file in files:
+                    ext = os.path.splitext(file)[1]
+                    if ext in self.patterns_memory["file_patterns"]:
+                        pattern = self.patterns_memory["file_patterns"][ext]
+                        if pattern["count"] > 0:
+                            common_issues = sorted(
+                                pattern["issues"].items(),
+                                key=lambda x: x[1],
+                                reverse=True
+                            )[:3]
+                            suggestions["file_suggestions"].append({
+                                "file_type": ext,
+                                "frequency": pattern["count"],
+                                "common_issues": common_issues
+                            })
+
+                # Find similar successful fixes
+                similar_fixes = []
+                fixes = self.fixes_memory  # loads and indexes the memory on first use
+                query_words = self._issue_words(issue_data)
+                # Fixes sharing no word with the query have zero similarity, so only score the
+                # successful fixes the index reaches through at least one word
+                candidates = set()
+                for word in query_words:
+                    candidates.update(self._word_index.get(word, ()))
+                for i in sorted(candidates):
                     # Calculate similarity score
-                    score = self._calculate_similarity(issue_data, fix["issue"])
+                    score = self._calculate_similarity(query_words, self._fix_word_sets[i])
                     if score > 0.5:  # Threshold for similarity
-                        similar_fixes.append((score, fix))
-
-            # Get top patterns and strategies from similar fixes
-            if similar_fixes:
-                similar_fixes.sort(reverse=True)  # Sort by similarity score
-                for _, fix in similar_fixes[:3]:
-                    for pattern in fix["patterns_identified"]:
-                        if pattern in self.patterns_memory["code_patterns"]:
-                            p_data = self.patterns_memory["code_patterns"][pattern]
-                            success_rate = p_data["success_count"] / p_data["count"]
-                            if success_rate > 0.7:  # Only suggest patterns with good success rate
-                                suggestions["pattern_suggestions"].append({
-                                    "pattern": pattern,
+                        similar_fixes.append((score, fixes[i]))
+
+                # Get top patterns and strategies from similar fixes
+                if similar_fixes:
+                    similar_fixes.sort(key=lambda x: x[0], reverse=True)  # Sort by similarity score
+                    for _, fix in similar_fixes[:3]:
+                        for pattern in fix["patterns_identified"]:
+                            if pattern in self.patterns_memory["code_patterns"]:
+                                p_data = self.patterns_memory["code_patterns"][pattern]
+                                success_rate = p_data["success_count"] / p_data["count"]
+                                if success_rate > 0.7:  # Only suggest patterns with good success rate
+                                    suggestions["pattern_suggestions"].append({
+                                        "pattern": pattern,
+                                        "success_rate": success_rate,
+                                        "frequency": p_data["count"]
+                                    })
+                    
+                        strategy = fix["fix_strategy"]
+                        if strategy and strategy in self.patterns_memory["fix_strategies"]:
+                            s_data = self.patterns_memory["fix_strategies"][strategy]
+                            success_rate = s_data["success_count"] / s_data["count"]
+                            if success_rate > 0.7:
+                                suggestions["strategy_suggestions"].append({
+                                    "strategy": strategy,
                                     "success_rate": success_rate,
-                                    "frequency": p_data["count"]
+                                    "frequency": s_data["count"]
                                 })
-                    
-                    strategy = fix["fix_strategy"]
-                    if strategy and strategy in self.patterns_memory["fix_strategies"]:
-                        s_data = self.patterns_memory["fix_strategies"][strategy]
-                        success_rate = s_data["success_count"] / s_data["count"]
-                        if success_rate > 0.7:
-                            suggestions["strategy_suggestions"].append({
-                                "strategy": strategy,
-                                "success_rate": success_rate,
-                                "frequency": s_data["count"]
-                            })
 
             return suggestions if any(suggestions.values()) else None
 
@@ -178,23 +268,24 @@ class LearningSystem:
             logger.error(f"Error getting fix suggestions: {e}")
             return None
 
-    def _calculate_similarity(self, issue1: Dict, issue2: Dict) -> float:
-        """Calculate similarity between two issues."""
-        try:
-            # Simple text similarity for now
-            text1 = (issue1.get("title", "") + " " + issue1.get("body", "")).lower()
-            text2 = (issue2.get("title", "") + " " + issue2.get("body", "")).lower()
-            
-            # Get words
-            words1 = set(text1.split())
-            words2 = set(text2.split())
-            
-            # Calculate Jaccard similarity
-            intersection = len(words1.intersection(words2))
-            union = len(words1.union(words2))
-            
-            return intersection / union if union > 0 else 0
-            
-        except Exception as e:
-            logger.error(f"Error calculating similarity: {e}")
+    def _index_fix(self, fix: Dict):
+        """Records the word set of a fix and indexes it if the fix succeeded."""
+        words = self._issue_words(fix.get("issue", {}))
+        i = len(self._fix_word_sets)
+        self._fix_word_sets.append(words)
+        if fix.get("success"):
+            for word in words:
+                self._word_index.setdefault(word, []).append(i)
+
+    @staticmethod
+    def _issue_words(issue: Dict) -> FrozenSet[str]:
+        """Lower-cased words of an issue's title and body."""
+        text = ((issue.get("title") or "") + " " + (issue.get("body") or "")).lower()
+        return frozenset(text.split())
+
+    def _calculate_similarity(self, words1: FrozenSet[str], words2: FrozenSet[str]) -> float:
+        """Calculate Jaccard similarity between the word sets of two issues."""
+        intersection = len(words1 & words2)
+        if not intersection:
             return 0.0
+        return intersection / (len(words1) + len(words2) - intersection)
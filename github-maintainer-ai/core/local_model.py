@@ -1,14 +1,43 @@
-from typing import Dict, Any
+from typing import Dict, Any, Iterator, Optional
+from functools import lru_cache
 import os
 import requests
+from requests.adapters import HTTPAdapter
+from core.file_utils import json_loads
 from core.logger import get_logger
 
 logger = get_logger(__name__)
 
+REQUEST_TIMEOUT = 120  # seconds to wait on the model server
+
+def _build_session() -> requests.Session:
+    """Create the HTTP session shared by every LocalModel in the process."""
+    session = requests.Session()
+    adapter = HTTPAdapter(pool_connections=4, pool_maxsize=16)
+    session.mount("http://", adapter)
+    session.mount("https://", adapter)
+    return session
+
+# Keep-alive connections to Ollama are reused across model instances and calls
+_session = _build_session()
+
+@lru_cache(maxsize=None)
+def _env(name: str, default: str) -> str:
+    """Read a model setting from the environment once per process."""
+    return os.environ.get(name, default)
+
 class LocalModel:
-    def __init__(self):
-        self.host = os.getenv("OLLAMA_HOST", "http://localhost:11434")
-        self.model = os.getenv("MODEL_NAME", "codellama")
+    def __init__(self, host: Optional[str] = None, model: Optional[str] = None):
+        """Set up a client for an Ollama server.
+        
+        Args:
+            host (str, optional): Server URL, e.g. ``load_config()["llm"]["host"]``;
+                defaults to OLLAMA_HOST
+            model (str, optional): Model name; defaults to MODEL_NAME
+        """
+        self.host = host or _env("OLLAMA_HOST", "http://localhost:11434")
+        self.model = model or _env("MODEL_NAME", "codellama")
+        self._session = _session
     
     def generate_suggestions(self, file: Dict, context: Dict) -> list:
         """Generate code improvement suggestions."""
@@ -37,21 +66,45 @@ class LocalModel:
             return {}
     
     def _query_model(self, payload: Dict) -> Dict[str, Any]:
-        """Send a query to the local LLM."""
+        """Send a query to the local LLM.
+        
+        Returns the final status chunk from Ollama with ``response`` holding the
+        full generated text.
+        """
         try:
-            response = requests.post(
-                f"{self.host}/api/generate",
-                json={
-                    "model": self.model,
-                    "prompt": self._format_prompt(payload)
-                }
-            )
-            response.raise_for_status()
-            return response.json()
+            parts = []
+            final: Dict[str, Any] = {}
+            for chunk in self._stream_model(payload):
+                parts.append(chunk.get("response", ""))
+                final = chunk
+            return {**final, "response": "".join(parts)}
         except Exception as e:
             logger.error(f"Error querying model: {e}")
             raise
     
+    def _stream_model(self, payload: Dict) -> Iterator[Dict[str, Any]]:
+        """Yield the NDJSON chunks Ollama streams back as tokens are generated."""
+        with self._session.post(
+            f"{self.host}/api/generate",
+            json={
+                "model": self.model,
+                "prompt": self._format_prompt(payload),
+                "stream": True
+            },
+            stream=True,
+            timeout=REQUEST_TIMEOUT
+        ) as response:
+            response.raise_for_status()
+            for line in response.iter_lines():
+                if not line:
+                    continue
+                chunk = json_loads(line)
+                if "error" in chunk:
+                    raise RuntimeError(chunk["error"])
+                yield chunk
+                if chunk.get("done"):
+                    break
+    
     def _format_prompt(self, payload: Dict) -> str:
         """Format the prompt for the model."""
         # Add prompt formatting logic here
@@ -13,7 +13,8 @@ def setup_logger():
                "<cyan>{name}</cyan>:<cyan>{function}</cyan> - "
                "<level>{message}</level>",
         level="INFO",
-        colorize=True
+        colorize=True,
+        enqueue=True  # write from a background thread so logging never blocks API calls
     )
     
     # Add file handler
@@ -21,7 +22,8 @@ def setup_logger():
         "github_maintainer.log",
         rotation="500 MB",
         retention="10 days",
-        level="DEBUG"
+        level="DEBUG",
+        enqueue=True
     )
     
     return logger
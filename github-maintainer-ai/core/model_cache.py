@@ -0,0 +1,69 @@
+from functools import lru_cache
+from typing import Any, Dict, List, Optional
+import hashlib
+import json
+import os
+import sqlite3
+import threading
+from core.local_model import LocalModel
+
+class ModelCache:
+    """SQLite-backed store of model outputs keyed by a hash of their inputs."""
+
+    def __init__(self, path: str = ".cache/model_cache.sqlite"):
+        self.path = path
+        directory = os.path.dirname(path)
+        if directory:
+            os.makedirs(directory, exist_ok=True)
+
+        self._lock = threading.Lock()
+        self._conn = sqlite3.connect(path, check_same_thread=False)
+        with self._conn:
+            self._conn.execute("CREATE TABLE IF NOT EXISTS cache (key TEXT PRIMARY KEY, value TEXT)")
+
+    def get(self, key: str) -> Optional[Any]:
+        """Returns the cached value for key, or None."""
+        with self._lock:
+            row = self._conn.execute("SELECT value FROM cache WHERE key = ?", (key,)).fetchone()
+        return json.loads(row[0]) if row else None
+
+    def set(self, key: str, value: Any):
+        """Stores a JSON-serializable value under key."""
+        with self._lock, self._conn:
+            self._conn.execute(
+                "INSERT OR REPLACE INTO cache (key, value) VALUES (?, ?)", (key, json.dumps(value))
+            )
+
+@lru_cache(maxsize=1)
+def get_model_cache() -> ModelCache:
+    """Returns the process-wide model cache."""
+    return ModelCache(os.getenv("MODEL_CACHE_PATH", ".cache/model_cache.sqlite"))
+
+def cache_key(model: LocalModel, task: str, payload: str, context: Dict) -> str:
+    """Builds a content-addressed key from the model, task, input and issue."""
+    issue = context.get("issue", {})
+    digest = hashlib.blake2b(payload.encode("utf-8", "surrogatepass"), digest_size=20).hexdigest()
+    return f"{model.model}:{task}:{digest}:{issue.get('id')}:{issue.get('title')}"
+
+def cached_generate_suggestions(model: LocalModel, file: Dict, context: Dict) -> List[str]:
+    """LocalModel.generate_suggestions, skipped when the same file and issue were seen before."""
+    cache = get_model_cache()
+    key = cache_key(model, "suggest_improvements", file["content"], context)
+    suggestions = cache.get(key)
+    if suggestions is None:
+        suggestions = model.generate_suggestions(file, context)
+        # Empty results are usually model errors, so don't pin them in the cache
+        if suggestions:
+            cache.set(key, suggestions)
+    return suggestions
+
+def cached_generate_changes(model: LocalModel, analysis: Dict, context: Dict) -> Dict:
+    """LocalModel.generate_changes, skipped when the same analysis and issue were seen before."""
+    cache = get_model_cache()
+    key = cache_key(model, "generate_changes", json.dumps(analysis, sort_keys=True, default=str), context)
+    changes = cache.get(key)
+    if changes is None:
+        changes = model.generate_changes(analysis, context)
+        if changes:
+            cache.set(key, changes)
+    return changes
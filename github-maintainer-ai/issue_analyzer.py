@@ -1,10 +1,62 @@
 #!/usr/bin/env python3
 
 from dataclasses import dataclass
-from typing import List, Optional, Set
+from typing import Dict, List, Optional, Set, Tuple
+from collections import Counter
+from concurrent.futures import ThreadPoolExecutor
+from functools import cached_property, lru_cache
 import re
 from github import Github, Auth, Issue, Repository
 from loguru import logger
+from core.github_client import GitHubClient
+
+# Technical patterns to look for in issue text, compiled once. The last field is a literal
+# every match contains, so patterns whose literal is absent are skipped without a regex scan.
+_CONCEPT_PATTERNS = (
+    # Error patterns
+    (re.compile(r'\b\w+error\b'), 'error_pattern', 'error'),
+    (re.compile(r'\berror\b'), 'error_pattern', 'error'),  # Catch standalone "error"
+    (re.compile(r'\b\w+exception\b'), 'exception_pattern', 'exception'),
+    (re.compile(r'\b\w+bug\b'), 'bug_pattern', 'bug'),
+    (re.compile(r'\bbug\b'), 'bug_pattern', 'bug'),  # Catch standalone "bug"
+    (re.compile(r'\b\w+crash\b'), 'crash_pattern', 'crash'),
+    # Speed-related patterns
+    (re.compile(r'\b0\s*mph\b'), 'zero_speed', 'mph'),
+    (re.compile(r'\b0\s*speed\b'), 'zero_speed', 'speed'),
+    (re.compile(r'\bspeed\s*=\s*0\b'), 'zero_speed', 'speed'),
+    # "a.*b" retries from every "a" on a line without a later "b", which is quadratic on long
+    # lines. Only the first "a" of a line can match, so anchor at the line start and skip to it.
+    (re.compile(r'^(?:(?!\bspeed).)*(\bspeed.*incorrect\b)', re.MULTILINE), 'speed_error', 'incorrect'),
+    (re.compile(r'^(?:(?!\bincorrect).)*(\bincorrect.*speed\b)', re.MULTILINE), 'speed_error', 'incorrect'),
+    (re.compile(r'\bspeed\b'), 'speed_related', 'speed'),
+    (re.compile(r'\bvelocity\b'), 'speed_related', 'velocity'),
+    (re.compile(r'\bmph\b'), 'speed_related', 'mph'),
+    (re.compile(r'\bkm/h\b'), 'speed_related', 'km/h'),
+    (re.compile(r'\bmemory\b'), 'memory_related', 'memory'),
+    (re.compile(r'\bperformance\b'), 'performance_related', 'performance'),
+    (re.compile(r'\bfunction\s+(\w+)\b'), 'function_name', 'function'),
+    (re.compile(r'\bmethod\s+(\w+)\b'), 'method_name', 'method'),
+    (re.compile(r'\bclass\s+(\w+)\b'), 'class_name', 'class'),
+    (re.compile(r'\bfile\s+[\'"]([\w/.]+)[\'"]'), 'file_reference', 'file'),
+    # Anchored at the start of each path-like run so the greedy scan back to the last
+    # extension happens once per run; an unanchored [\w/.]+ retries at every "/" or "."
+    # and goes quadratic on long paths
+    (re.compile(r'(?<![\w/.])[/.]*(\w[\w/.]*\.(?:py|js|cpp|h|cs))\b'), 'code_file', '.'),
+)
+
+# Concept categories that mark an issue as a bug report
+_BUG_INDICATORS = frozenset({
+    'error_pattern', 'exception_pattern', 'bug_pattern', 'crash_pattern',
+    'zero_speed', 'speed_error'  # Speed-related issues are often bugs
+})
+# Concept values that mark an issue as a feature request
+_FEATURE_INDICATORS = frozenset({'feature', 'enhancement', 'request', 'add', 'implement'})
+
+# Extensions whose content is scanned for issue concepts
+_CODE_EXTENSIONS = frozenset({'py', 'js', 'cpp', 'h', 'cs'})
+
+_RELEVANCE_THRESHOLD = 0.5  # score a file needs to be considered affected by a bug
+MAX_SCORING_WORKERS = 16  # concurrent blob reads while scoring files
 
 @dataclass
 class CodeFix:
@@ -16,17 +68,26 @@ class CodeFix:
 class IssueAnalysis:
     def __init__(self):
         self.affected_files: Set[str] = set()
-        self.key_concepts: Set[str] = set()
+        # (category, matched text); the text is kept whole and may contain ':' (e.g. speed_error)
+        self.key_concepts: Set[Tuple[str, str]] = set()
         self.error_patterns: Set[str] = set()
         self.suggested_fixes: List[str] = []
         self.confidence_score: float = 0.0
 
 class IssueAnalyzer:
-    def __init__(self, repo: Repository):
+    def __init__(self, repo: Repository, gh: Optional[GitHubClient] = None):
         self.repo = repo
+        # Tree and blob reads go through the client's ETag cache to save rate limit across runs
+        self.github_client = gh or GitHubClient.default()
+        # Blobs are content-addressed, so lowercased content can be reused by SHA for the whole run
+        self._get_lowered_blob = lru_cache(maxsize=4096)(self._get_lowered_blob)
     
-    def analyze_issue(self, issue: Issue) -> Optional[List[str]]:
-        """Analyzes an issue to determine if it's fixable and what needs to be fixed."""
+    def analyze_issue(self, issue: Issue, comments: Optional[List[str]] = None) -> Optional[List[str]]:
+        """Analyzes an issue to determine if it's fixable and what needs to be fixed.
+        
+        Comment bodies that were already fetched (e.g. in a batch) can be passed in
+        to save a request; otherwise they are loaded from the issue when needed.
+        """
         try:
             # Create analysis object
             analysis = IssueAnalysis()
@@ -41,7 +102,7 @@ class IssueAnalyzer:
             # Determine issue type
             if self._is_bug_report(analysis):
                 logger.info(f"Issue #{issue.number} appears to be a bug report")
-                return self._analyze_bug_report(issue, analysis)
+                return self._analyze_bug_report(issue, analysis, comments)
             elif self._is_feature_request(analysis):
                 logger.info(f"Issue #{issue.number} appears to be a feature request")
                 return self._analyze_feature_request(issue, analysis)
@@ -57,77 +118,58 @@ class IssueAnalyzer:
         """Extracts key concepts and patterns from issue text."""
         combined_text = f"{title}\n{body}".lower()
         
-        # Technical patterns to look for
-        patterns = [
-            # Error patterns
-            (r'\b\w+error\b', 'error_pattern'),
-            (r'\berror\b', 'error_pattern'),  # Catch standalone "error"
-            (r'\b\w+exception\b', 'exception_pattern'),
-            (r'\b\w+bug\b', 'bug_pattern'),
-            (r'\bbug\b', 'bug_pattern'),  # Catch standalone "bug"
-            (r'\b\w+crash\b', 'crash_pattern'),
-            
-            # Speed-related patterns
-            (r'\b0\s*mph\b', 'zero_speed'),
-            (r'\b0\s*speed\b', 'zero_speed'),
-            (r'\bspeed\s*=\s*0\b', 'zero_speed'),
-            (r'\bspeed.*incorrect\b', 'speed_error'),
-            (r'\bincorrect.*speed\b', 'speed_error'),
-            (r'\bspeed\b', 'speed_related'),
-            (r'\bvelocity\b', 'speed_related'),
-            (r'\bmph\b', 'speed_related'),
-            (r'\bkm/h\b', 'speed_related'),
-            (r'\bmemory\b', 'memory_related'),
-            (r'\bperformance\b', 'performance_related'),
-            (r'\bfunction\s+(\w+)\b', 'function_name'),
-            (r'\bmethod\s+(\w+)\b', 'method_name'),
-            (r'\bclass\s+(\w+)\b', 'class_name'),
-            (r'\bfile\s+[\'"]([\w/.]+)[\'"]', 'file_reference'),
-            (r'\b([\w/.]+\.(?:py|js|cpp|h))\b', 'code_file')
-        ]
-        
-        for pattern, category in patterns:
-            matches = re.finditer(pattern, combined_text)
-            for match in matches:
-                if len(match.groups()) > 0:
-                    analysis.key_concepts.add(f"{category}:{match.group(1)}")
-                else:
-                    analysis.key_concepts.add(f"{category}:{match.group()}")
+        for pattern, category, literal in _CONCEPT_PATTERNS:
+            if literal not in combined_text:
+                continue
+            # Patterns with a capture group record the captured name, the rest the whole match
+            group = 1 if pattern.groups else 0
+            for match in pattern.finditer(combined_text):
+                analysis.key_concepts.add((category, match.group(group)))
     
     def _is_bug_report(self, analysis: IssueAnalysis) -> bool:
         """Determines if the issue is a bug report based on extracted concepts."""
-        bug_indicators = {
-            'error_pattern', 'exception_pattern', 'bug_pattern', 'crash_pattern',
-            'zero_speed', 'speed_error'  # Speed-related issues are often bugs
-        }
-        concepts = {concept.split(':')[0] for concept in analysis.key_concepts}
-        return bool(concepts.intersection(bug_indicators))
+        return any(category in _BUG_INDICATORS for category, _ in analysis.key_concepts)
     
     def _is_feature_request(self, analysis: IssueAnalysis) -> bool:
         """Determines if the issue is a feature request based on extracted concepts."""
-        feature_indicators = {'feature', 'enhancement', 'request', 'add', 'implement'}
-        return any(concept.split(':')[1] in feature_indicators for concept in analysis.key_concepts)
+        return any(value in _FEATURE_INDICATORS for _, value in analysis.key_concepts)
     
-    def _analyze_bug_report(self, issue: Issue, analysis: IssueAnalysis) -> Optional[List[str]]:
+    @cached_property
+    def _repo_files(self) -> List[Dict]:
+        """Every file of the default branch, listed once per analyzer with one recursive Git tree request."""
+        tree = self.github_client.get_json(
+            f"repos/{self.repo.full_name}/git/trees/{self.repo.default_branch}",
+            {"recursive": "1"}
+        )
+        if tree.get("truncated"):
+            logger.warning("Repository tree is truncated; some files will not be analyzed")
+        return [entry for entry in tree["tree"] if entry["type"] == "blob"]
+    
+    def _analyze_bug_report(self, issue: Issue, analysis: IssueAnalysis,
+                            comments: Optional[List[str]] = None) -> Optional[List[str]]:
         """Analyzes a bug report to identify affected files."""
         try:
-            # Get repository contents
-            contents = self.repo.get_contents("")
-            
             # Get all comments for additional context
-            comments = [comment.body for comment in issue.get_comments()]
+            if comments is None:
+                comments = [comment.body for comment in issue.get_comments()]
             combined_text = f"{issue.title}\n{issue.body or ''}\n{''.join(comments)}".lower()
             
-            while contents:
-                content = contents.pop(0)
-                if content.type == "dir":
-                    contents.extend(self.repo.get_contents(content.path))
-                    continue
-                
-                file_path = content.path
-                score = self._calculate_relevance_score(file_path, content, combined_text, analysis)
-                
-                if score > 0.5:  # Threshold for considering a file relevant
+            # Concepts are matched by their text only, so several categories can share one search.
+            # Terms are encoded once so file contents can be searched as bytes without decoding.
+            concept_terms = Counter(value.encode('utf-8') for _, value in analysis.key_concepts)
+            
+            # Files are scored independently and mostly wait on blob downloads, so they run
+            # concurrently; results are merged here in tree order
+            files = self._repo_files
+            with ThreadPoolExecutor(max_workers=MAX_SCORING_WORKERS) as executor:
+                scores = list(executor.map(
+                    lambda entry: self._calculate_relevance_score(
+                        entry["path"], entry["sha"], combined_text, concept_terms),
+                    files))
+            
+            for entry, score in zip(files, scores):
+                file_path = entry["path"]
+                if score > _RELEVANCE_THRESHOLD:
                     analysis.affected_files.add(file_path)
                     logger.info(f"Found relevant file: {file_path} (score: {score:.2f})")
             
@@ -143,38 +185,36 @@ class IssueAnalyzer:
             logger.error(f"Error in bug report analysis: {str(e)}")
             return None
 
-    def _calculate_relevance_score(self, file_path: str, content, issue_text: str, analysis: IssueAnalysis) -> float:
-        """Calculates how relevant a file is to the issue."""
+    def _calculate_relevance_score(self, file_path: str, blob_sha: str, issue_text: str,
+                                   concept_terms: Dict[bytes, int],
+                                   threshold: float = _RELEVANCE_THRESHOLD) -> float:
+        """Calculates how relevant a file is to the issue.
+        
+        Path-based signals are scored first; the content is not fetched when they
+        already put the file over ``threshold`` or when no number of concept matches
+        could. Scoring stops as soon as the threshold is crossed, so scores above it
+        are lower bounds. ``concept_terms`` maps each concept's UTF-8 text to the number of
+        concepts sharing it.
+        """
         score = 0.0
         
         try:
             # Check if file is directly referenced
             if file_path.lower() in issue_text:
                 score += 1.0
+                if score > threshold:
+                    return score
             
             # Check if file extension matches any mentioned technology
             ext = file_path.split('.')[-1].lower()
             if f".{ext}" in issue_text:
                 score += 0.3
             
-            # For code files, analyze content
-            if ext in ['py', 'js', 'cpp', 'h', 'cs']:
-                try:
-                    content_text = content.decoded_content.decode('utf-8').lower()
-                    
-                    # Check for key concepts in file content
-                    for concept in analysis.key_concepts:
-                        if concept.split(':')[1] in content_text:
-                            score += 0.4
-                    
-                    # Special handling for Python files
-                    if ext == 'py':
-                        module_name = file_path.replace('/', '.').replace('.py', '')
-                        if module_name in issue_text:
-                            score += 0.5
-                    
-                except Exception as e:
-                    logger.error(f"Error analyzing file content: {str(e)}")
+            # Special handling for Python files
+            if ext == 'py':
+                module_name = file_path.replace('/', '.').replace('.py', '')
+                if module_name in issue_text:
+                    score += 0.5
             
             # Check for structural relevance
             if 'main' in file_path.lower():
@@ -184,31 +224,50 @@ class IssueAnalyzer:
             if 'test' in file_path.lower() and 'test' in issue_text:
                 score += 0.3
             
+            if score > threshold:
+                return score
+            
+            # For code files, analyze content unless even matching every concept could not
+            # lift the score over the relevance threshold
+            max_content_score = 0.4 * sum(concept_terms.values())
+            if ext in _CODE_EXTENSIONS and score + max_content_score > threshold:
+                try:
+                    content = self._get_lowered_blob(blob_sha)
+                    
+                    # Check for key concepts in file content
+                    for term, count in concept_terms.items():
+                        if term in content:
+                            score += 0.4 * count
+                            if score > threshold:
+                                break
+                    
+                except Exception as e:
+                    logger.error(f"Error analyzing file content: {str(e)}")
+            
         except Exception as e:
             logger.error(f"Error calculating relevance score: {str(e)}")
         
         return score
     
+    def _get_lowered_blob(self, blob_sha: str) -> bytes:
+        """Fetches a file's content by its blob SHA, lowercased for concept matching."""
+        return self.github_client.get_blob(self.repo.full_name, blob_sha).lower()
+    
     def _analyze_repository_structure(self, issue: Issue, analysis: IssueAnalysis) -> Optional[List[str]]:
         """Analyzes repository structure to find relevant files."""
         try:
-            contents = self.repo.get_contents("")
             core_files = []
             test_files = []
             
-            while contents:
-                content = contents.pop(0)
-                if content.type == "dir":
-                    contents.extend(self.repo.get_contents(content.path))
-                else:
-                    file_path = content.path.lower()
-                    
-                    # Categorize files
-                    if file_path.endswith(('.py', '.js', '.cpp', '.h', '.cs')):
-                        if 'test' in file_path:
-                            test_files.append(content.path)
-                        elif any(x in file_path for x in ['main', 'core', 'index']):
-                            core_files.append(content.path)
+            for entry in self._repo_files:
+                file_path = entry["path"].lower()
+                
+                # Categorize files
+                if file_path.endswith(('.py', '.js', '.cpp', '.h', '.cs')):
+                    if 'test' in file_path:
+                        test_files.append(entry["path"])
+                    elif any(x in file_path for x in ['main', 'core', 'index']):
+                        core_files.append(entry["path"])
             
             # For bugs, include both core and test files
             if self._is_bug_report(analysis):
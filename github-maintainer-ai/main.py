@@ -2,6 +2,7 @@
 
 import sys
 import os
+import re
 from typing import Optional
 from loguru import logger
 from core.github_client import GitHubClient
@@ -10,6 +11,9 @@ from code_fixer import CodeFixer
 from pr_manager import PRManager
 from dotenv import load_dotenv
 
+# HTTPS and SSH remotes; the owner/name form is handled without a regex
+_REPO_URL = re.compile(r"(?:https?://github\.com/|git@github\.com:)?([^/]+)/([^/\.]+)(?:\.git)?/?$")
+
 def parse_repository_url(url: str) -> tuple[str, str]:
     """Parse a GitHub repository URL into owner and name.
     
@@ -18,21 +22,70 @@ def parse_repository_url(url: str) -> tuple[str, str]:
     - git@github.com:owner/repo.git
     - owner/repo
     """
-    import re
-    
-    patterns = [
-        r"(?:https?://github\.com/)?([^/]+)/([^/\.]+)(?:\.git)?/?$",
-        r"git@github\.com:([^/]+)/([^/\.]+)(?:\.git)?/?$"
-    ]
+    if "://" not in url and "@" not in url:
+        path = url[:-1] if url.endswith("/") else url
+        path = path[:-4] if path.endswith(".git") else path
+        owner, _, name = path.partition("/")
+        if owner and name and "/" not in name and "." not in name:
+            return owner, name
     
-    for pattern in patterns:
-        match = re.match(pattern, url)
-        if match:
-            return match.group(1), match.group(2)
+    match = _REPO_URL.match(url)
+    if match:
+        return match.group(1), match.group(2)
     
     raise ValueError(f"Invalid GitHub repository URL format: {url}. " 
                     "Expected format: owner/repo or https://github.com/owner/repo")
 
+def process_issue(issue, issue_analyzer: IssueAnalyzer, code_fixer: CodeFixer, pr_manager: PRManager,
+                  comments: Optional[list] = None):
+    """Analyzes one issue, generates fixes and opens a pull request for them.
+    
+    ``comments`` are the issue's comment bodies when they were already fetched.
+    """
+    logger.info(f"Analyzing issue #{issue.number}: {issue.title}")
+
+    try:
+        # Analyze the issue and find affected files
+        affected_files = issue_analyzer.analyze_issue(issue, comments)
+        if not affected_files:
+            logger.info("No files identified for this issue")
+            issue.create_comment(
+                "I analyzed this issue but couldn't identify the affected files. "
+                "Could you please provide more details about which files need to be modified?"
+            )
+            return
+        
+        logger.info(f"Identified {len(affected_files)} affected files:")
+        for file in affected_files:
+            logger.info(f"- {file}")
+        
+        # Generate fixes
+        logger.info(f"Generating fixes for issue #{issue.number}...")
+        fixes = code_fixer.generate_fix(issue, affected_files)
+        if not fixes:
+            logger.info(f"Could not generate fixes for issue #{issue.number}")
+            issue.create_comment(
+                "I analyzed this issue but couldn't generate a reliable fix. "
+                "This might require human intervention or more context."
+            )
+            return
+        
+        # Create pull request
+        logger.info(f"Creating pull request for issue #{issue.number}...")
+        pr = pr_manager.create_pull_request(issue, fixes, code_fixer.get_analysis())
+        if not pr:
+            logger.warning(f"Failed to create pull request for issue #{issue.number}")
+            return
+        
+        logger.info(f"Created pull request #{pr.number}: {pr.html_url}")
+        issue.create_comment(
+            f"I've created a pull request with a potential fix: {pr.html_url}\n\n"
+            f"Please review the changes and let me know if any adjustments are needed."
+        )
+
+    except Exception as e:
+        logger.error(f"Error processing issue #{issue.number}: {str(e)}")
+
 def main():
     """Main entry point for the GitHub Maintainer AI agent."""
     try:
@@ -68,7 +121,7 @@ def main():
         logger.info(f"- Max issues: {config['max_issues']}")
 
         # Initialize components
-        github_client = GitHubClient()
+        github_client = GitHubClient.default()
         try:
             repo = github_client.get_repository(owner, repo)
             logger.info(f"Successfully connected to repository: {repo.full_name}")
@@ -76,9 +129,9 @@ def main():
             logger.error(f"Failed to access repository: {str(e)}")
             sys.exit(1)
 
-        issue_analyzer = IssueAnalyzer(repo)
-        code_fixer = CodeFixer(repo)
-        pr_manager = PRManager(repo)
+        issue_analyzer = IssueAnalyzer(repo, github_client)
+        code_fixer = CodeFixer(repo, github_client)
+        pr_manager = PRManager(repo, github_client)
 
         # Get open issues
         logger.info("Scanning for open issues...")
@@ -127,79 +180,16 @@ def main():
             logger.info("No open issues found to process")
             return
 
+        # Prefetch the comments of every issue in one GraphQL round trip. get_issues also
+        # returns pull requests, which the issue(number:) field cannot resolve.
+        comments_by_issue = github_client.graphql_issue_comments(
+            repo.owner.login, repo.name, [issue.number for issue in issues if issue.pull_request is None]
+        )
+
         # Process each issue
         for issue in issues:
-            logger.info(f"Analyzing issue #{issue.number}: {issue.title}")
-
-            try:
-                # Analyze the issue and find affected files
-                analysis = issue_analyzer.analyze_issue(issue)
-                if isinstance(analysis, dict) and analysis.get('affected_files'):
-                    logger.info(f"Identified {len(analysis['affected_files'])} affected files:")
-                    for file in analysis['affected_files']:
-                        logger.info(f"- {file}")
-                    
-                    # Generate fixes
-                    logger.info(f"Generating fixes for issue #{issue.number}...")
-                    fixes = code_fixer.generate_fix(issue, analysis['affected_files'])
-                    
-                    if fixes:
-                        # Create branch name from issue
-                        branch_name = f"fix/issue-{issue.number}-{issue.title.lower().replace(' ', '-')[:50]}"
-                        
-                        # Create pull request
-                        logger.info(f"Creating pull request for issue #{issue.number}...")
-                        try:
-                            pr = pr_manager.create_pull_request(
-                                title=f"Fix #{issue.number}: {issue.title}",
-                                body=f"Automated fix for issue #{issue.number}\n\n{fixes['description']}\n\nChanges:\n{fixes['changes']}",
-                                branch_name=branch_name,
-                                changes=fixes['changes'],
-                                base_branch=config['branch']
-                            )
-                            logger.info(f"Created pull request #{pr.number}: {pr.html_url}")
-                            
-                            # Add a comment to the issue
-                            issue.create_comment(
-                                f"I've created a pull request with a potential fix: {pr.html_url}\n\n"
-                                f"Please review the changes and let me know if any adjustments are needed."
-                            )
-                        except Exception as e:
-                            logger.error(f"Failed to create pull request for issue #{issue.number}: {str(e)}")
-                    else:
-                        logger.info(f"Could not generate fixes for issue #{issue.number}")
-                        issue.create_comment(
-                            "I analyzed this issue but couldn't generate a reliable fix. "
-                            "This might require human intervention or more context."
-                        )
-                else:
-                    logger.info("No files identified for this issue")
-                    issue.create_comment(
-                        "I analyzed this issue but couldn't identify the affected files. "
-                        "Could you please provide more details about which files need to be modified?"
-                    )
-                    continue
-
-            except Exception as e:
-                logger.error(f"Error processing issue #{issue.number}: {str(e)}")
-                continue
-                logger.info("No fixes generated for this issue")
-                continue
-
-            # Create pull request
-            pr = pr_manager.create_pull_request(
-                issue=issue,
-                fixes=fixes,
-                analysis=code_fixer.get_analysis()
-            )
-
-            if pr:
-                logger.info(f"Created pull request #{pr.number}: {pr.title}")
-                issue.create_comment(
-                    f"I've created a pull request with some suggested fixes: #{pr.number}"
-                )
-            else:
-                logger.warning("Failed to create pull request")
+            github_client.wait_for_rate_limit()
+            process_issue(issue, issue_analyzer, code_fixer, pr_manager, comments_by_issue.get(issue.number))
 
     except Exception as e:
         logger.error(f"Error in main process: {str(e)}")
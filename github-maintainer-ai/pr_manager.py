@@ -1,13 +1,47 @@
 #!/usr/bin/env python3
 
-from typing import List, Optional
-from github import Repository, Issue, PullRequest
+from typing import Dict, List, Optional
+import re
+from github import InputGitTreeElement, Repository, Issue, PullRequest
 from loguru import logger
 from issue_analyzer import CodeFix
+from core.github_client import OBJECT_TTL, GitHubClient
+
+def _apply_fixes(content: str, fixes: List[CodeFix]) -> str:
+    """Replaces every fix's old code in one pass over the content.
+    
+    All replacements apply to the original text, so one fix's new code is never
+    rewritten by another; at a shared position the longest old code wins.
+    """
+    if len(fixes) == 1:
+        return content.replace(fixes[0].old_code, fixes[0].new_code)
+    
+    replacements = {}
+    for fix in fixes:
+        replacements.setdefault(fix.old_code, fix.new_code)
+    pattern = re.compile("|".join(re.escape(old) for old in sorted(replacements, key=len, reverse=True)))
+    return pattern.sub(lambda match: replacements[match.group(0)], content)
 
 class PRManager:
-    def __init__(self, repo: Repository):
+    def __init__(self, repo: Repository, gh: Optional[GitHubClient] = None):
         self.repo = repo
+        self.github_client = gh or GitHubClient.default()
+    
+    def _get_tree_entry(self, tree_sha: str, path: str) -> Dict:
+        """Finds a path's tree entry by walking down one directory tree at a time.
+        
+        Used when the recursive tree listing came back truncated. Raises KeyError if
+        the path does not exist.
+        """
+        entry = None
+        for part in path.split("/"):
+            if entry is not None:
+                tree_sha = entry["sha"]
+            tree = self.github_client.get_json(
+                f"repos/{self.repo.full_name}/git/trees/{tree_sha}", ttl=OBJECT_TTL
+            )
+            entry = {child["path"]: child for child in tree["tree"]}[part]
+        return entry
     
     def create_pull_request(self, issue: Issue, fixes: List[CodeFix], analysis) -> Optional[PullRequest]:
         """Creates a pull request with the generated fixes."""
@@ -21,7 +55,7 @@ class PRManager:
             # Create new branch from default branch
             try:
                 ref = self.repo.get_git_ref(f"heads/{default_branch}")
-                self.repo.create_git_ref(
+                branch_ref = self.repo.create_git_ref(
                     ref=f"refs/heads/{branch_name}",
                     sha=ref.object.sha
                 )
@@ -34,34 +68,59 @@ class PRManager:
             commit_message = f"Fix issue #{issue.number}: {issue.title}\n\n"
             commit_message += "Changes made:\n"
             
+            # Fixes are applied in memory and pushed as one commit: a tree of every changed
+            # file on top of the branch point, instead of a contents API commit per fix
+            base_commit = self.repo.get_git_commit(ref.object.sha)
+            base_tree = self.github_client.get_json(
+                f"repos/{self.repo.full_name}/git/trees/{base_commit.tree.sha}",
+                {"recursive": "1"},
+                ttl=OBJECT_TTL
+            )
+            base_files = {entry["path"]: entry for entry in base_tree["tree"] if entry["type"] == "blob"}
+            if base_tree.get("truncated"):
+                logger.warning(f"Tree of {self.repo.full_name} is truncated, looking up missing files one by one")
+            
+            fixes_by_file = {}
             for fix in fixes:
+                fixes_by_file.setdefault(fix.file_path, []).append(fix)
+            
+            changed_files = {}  # path -> new content
+            for file_path, file_fixes in fixes_by_file.items():
                 try:
-                    # Get the file content
-                    file_content = self.repo.get_contents(
-                        fix.file_path,
-                        ref=branch_name
-                    )
+                    # Get the file content; files left out of a truncated listing are looked up by path
+                    if file_path not in base_files and base_tree.get("truncated"):
+                        base_files[file_path] = self._get_tree_entry(base_commit.tree.sha, file_path)
+                    blob_sha = base_files[file_path]["sha"]
+                    old_content = self.github_client.get_blob(self.repo.full_name, blob_sha).decode('utf-8')
                     
                     # Update content
-                    new_content = file_content.decoded_content.decode('utf-8')
-                    new_content = new_content.replace(fix.old_code, fix.new_code)
-                    
-                    # Create commit
-                    self.repo.update_file(
-                        path=fix.file_path,
-                        message=f"Fix: {fix.description}",
-                        content=new_content.encode('utf-8'),
-                        sha=file_content.sha,
-                        branch=branch_name
-                    )
+                    changed_files[file_path] = _apply_fixes(old_content, file_fixes)
                     
-                    commit_message += f"- {fix.description}\n"
-                    logger.info(f"Committed fix to {fix.file_path}")
+                    for fix in file_fixes:
+                        commit_message += f"- {fix.description}\n"
+                    logger.info(f"Applied {len(file_fixes)} fixes to {file_path}")
                     
                 except Exception as e:
-                    logger.error(f"Error applying fix to {fix.file_path}: {str(e)}")
+                    logger.error(f"Error applying fixes to {file_path}: {str(e)}")
                     continue
             
+            # Create commit
+            if changed_files:
+                try:
+                    tree = self.repo.create_git_tree(
+                        [
+                            InputGitTreeElement(path, base_files[path]["mode"], "blob", content=content)
+                            for path, content in changed_files.items()
+                        ],
+                        base_tree=base_commit.tree
+                    )
+                    commit = self.repo.create_git_commit(commit_message, tree, [base_commit])
+                    branch_ref.edit(sha=commit.sha)
+                    logger.info(f"Committed {len(changed_files)} changed files to {branch_name}")
+                except Exception as e:
+                    logger.error(f"Error committing fixes: {str(e)}")
+                    return None
+            
             # Add analysis details to PR body
             pr_body = f"This PR addresses issue #{issue.number}\n\n"
             pr_body += commit_message + "\n"
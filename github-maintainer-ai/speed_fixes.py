@@ -6,14 +6,13 @@ from github import Repository, Issue
 from loguru import logger
 from issue_analyzer import CodeFix
 
-def _fix_speed_property(block: str) -> Optional[CodeFix]:
-    """Fixes a Speed property implementation."""
-    # Example old code:
-    # public float Speed { get; set; }
-    # or
-    # public float Speed { get { return _speed; } set { _speed = value; } }
-    
-    new_code = '''public float Speed
+# Speed code shapes recognized by the fixers below
+_SPEED_EQ_ZERO = re.compile(r'if\s*\(\s*speed\s*==\s*0')
+_SPEED_CMP = re.compile(r'if\s*\(\s*speed\s*[<>]=?\s*')
+_SPEED_ASSIGN = re.compile(r'speed\s*=\s*[^;]+;')
+
+# Replacement code emitted by the fixers
+_FIX_SPEED_PROPERTY_CODE = '''public float Speed
 {
     get { return _speed; }
     set
@@ -44,18 +43,8 @@ def _fix_speed_property(block: str) -> Optional[CodeFix]:
 
 private float _speed;
 public string DisplayedSpeed { get; private set; }'''
-    
-    return CodeFix(
-        file_path="",
-        old_code=block,
-        new_code=new_code,
-        description="Enhanced Speed property with validation and proper display formatting"
-    )
 
-def _fix_speed_method(block: str) -> Optional[CodeFix]:
-    """Fixes a speed calculation method."""
-    if "GetSpeed" in block:
-        new_code = '''public float GetSpeed()
+_FIX_GET_SPEED_CODE = '''public float GetSpeed()
 {
     try
     {
@@ -85,8 +74,8 @@ def _fix_speed_method(block: str) -> Optional[CodeFix]:
         return 0f;
     }
 }'''
-    else:
-        new_code = '''private void UpdateSpeed(float newSpeed)
+
+_FIX_UPDATE_SPEED_CODE = '''private void UpdateSpeed(float newSpeed)
 {
     try
     {
@@ -119,19 +108,8 @@ def _fix_speed_method(block: str) -> Optional[CodeFix]:
         Speed = 0f;
     }
 }'''
-    
-    return CodeFix(
-        file_path="",
-        old_code=block,
-        new_code=new_code,
-        description="Enhanced speed calculation with proper validation and error handling"
-    )
 
-def _fix_speed_comparison(block: str) -> Optional[CodeFix]:
-    """Fixes speed comparison code."""
-    # Handle simple zero comparisons
-    if re.search(r'if\s*\(\s*speed\s*==\s*0', block):
-        new_code = '''// Check if vehicle is effectively stopped
+_FIX_SPEED_EQ_ZERO_CODE = '''// Check if vehicle is effectively stopped
 if (Math.Abs(speed) <= 0.01f)
 {
     speed = 0f;  // Explicitly set to zero
@@ -139,9 +117,8 @@ if (Math.Abs(speed) <= 0.01f)
     DisplayedSpeed = "Stopped";
     Logger.LogDebug("Vehicle speed below threshold, marked as stopped");
 }'''
-    # Handle threshold comparisons
-    elif re.search(r'if\s*\(\s*speed\s*[<>]=?\s*', block):
-        new_code = '''// Check speed against threshold
+
+_FIX_SPEED_THRESHOLD_CODE = '''// Check speed against threshold
 if (Math.Abs(speed) <= 0.01f)
 {
     speed = 0f;
@@ -160,21 +137,8 @@ else
     DisplayedSpeed = $"{speed:F1} MPH";
     Logger.LogDebug($"Speed updated to {DisplayedSpeed}");
 }'''
-    else:
-        return None
-    
-    return CodeFix(
-        file_path="",
-        old_code=block,
-        new_code=new_code,
-        description="Improved speed comparison with proper thresholds and status updates"
-    )
 
-def _fix_speed_general(block: str) -> Optional[CodeFix]:
-    """Fixes general speed-related code."""
-    # Handle speed assignments
-    if re.search(r'speed\s*=\s*[^;]+;', block):
-        new_code = '''// Update speed with validation
+_FIX_SPEED_ASSIGN_CODE = '''// Update speed with validation
 try
 {
     float newSpeed = CalculateSpeed();
@@ -199,11 +163,60 @@ catch (Exception ex)
     speed = 0f;
     DisplayedSpeed = "Error";
 }'''
-        
+
+def _fix_speed_property(block: str) -> Optional[CodeFix]:
+    """Fixes a Speed property implementation."""
+    # Example old code:
+    # public float Speed { get; set; }
+    # or
+    # public float Speed { get { return _speed; } set { _speed = value; } }
+    return CodeFix(
+        file_path="",
+        old_code=block,
+        new_code=_FIX_SPEED_PROPERTY_CODE,
+        description="Enhanced Speed property with validation and proper display formatting"
+    )
+
+def _fix_speed_method(block: str) -> Optional[CodeFix]:
+    """Fixes a speed calculation method."""
+    if "GetSpeed" in block:
+        new_code = _FIX_GET_SPEED_CODE
+    else:
+        new_code = _FIX_UPDATE_SPEED_CODE
+    
+    return CodeFix(
+        file_path="",
+        old_code=block,
+        new_code=new_code,
+        description="Enhanced speed calculation with proper validation and error handling"
+    )
+
+def _fix_speed_comparison(block: str) -> Optional[CodeFix]:
+    """Fixes speed comparison code."""
+    # Handle simple zero comparisons
+    if _SPEED_EQ_ZERO.search(block):
+        new_code = _FIX_SPEED_EQ_ZERO_CODE
+    # Handle threshold comparisons
+    elif _SPEED_CMP.search(block):
+        new_code = _FIX_SPEED_THRESHOLD_CODE
+    else:
+        return None
+    
+    return CodeFix(
+        file_path="",
+        old_code=block,
+        new_code=new_code,
+        description="Improved speed comparison with proper thresholds and status updates"
+    )
+
+def _fix_speed_general(block: str) -> Optional[CodeFix]:
+    """Fixes general speed-related code."""
+    # Handle speed assignments
+    if _SPEED_ASSIGN.search(block):
         return CodeFix(
             file_path="",
             old_code=block,
-            new_code=new_code,
+            new_code=_FIX_SPEED_ASSIGN_CODE,
             description="Added comprehensive speed validation and error handling"
         )
     
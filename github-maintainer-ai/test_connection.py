@@ -1,50 +1,48 @@
 #!/usr/bin/env python3
 
-import os
-from dotenv import load_dotenv
-from github import Github, Auth
 from loguru import logger
+from core.logger import setup_logger
+from config.settings import get_github_token
+from core.github_client import GitHubClient
 
 def test_github_connection():
-    # Load environment variables
-    load_dotenv()
-    
-    # Get GitHub token
-    token = os.getenv("GITHUB_TOKEN")
-    if not token:
-        print("ERROR: No GITHUB_TOKEN found in .env file")
+    # Get GitHub token (.env is read once per process)
+    try:
+        token = get_github_token()
+    except ValueError as e:
+        logger.error(str(e))
         return
     
-    print(f"Found token (first/last 4 chars): {token[:4]}...{token[-4:]}")
+    logger.info(f"Found token (first/last 4 chars): {token[:4]}...{token[-4:]}")
     
     try:
-        # Initialize GitHub client with newer auth method
-        auth = Auth.Token(token)
-        g = Github(auth=auth)
+        # Use the process-wide client so repeated runs in one process share its connection pool
+        gh = GitHubClient.default()
+        g = gh.client
         
-        # Test authentication
-        user = g.get_user()
-        print(f"Successfully authenticated as: {user.login}")
+        # Test authentication (the client fetched the user when it was created)
+        logger.info(f"Successfully authenticated as: {gh.login}")
         
         # Test repository access
         repo_url = "TheGrayGryphon/Run8-Speed-Check"
-        print(f"\nTesting access to repository: {repo_url}")
+        logger.info(f"Testing access to repository: {repo_url}")
         repo = g.get_repo(repo_url)
-        print(f"Repository details:")
-        print(f"- Name: {repo.name}")
-        print(f"- Owner: {repo.owner.login}")
-        print(f"- Description: {repo.description}")
+        logger.info("Repository details:")
+        logger.info(f"- Name: {repo.name}")
+        logger.info(f"- Owner: {repo.owner.login}")
+        logger.info(f"- Description: {repo.description}")
         
         # Test issues access
-        print("\nFetching issues...")
+        logger.info("Fetching issues...")
         issues = list(repo.get_issues(state="open"))
-        print(f"Found {len(issues)} open issues")
+        logger.info(f"Found {len(issues)} open issues")
         for issue in issues:
-            print(f"- #{issue.number}: {issue.title}")
+            logger.info(f"- #{issue.number}: {issue.title}")
             
     except Exception as e:
-        print(f"ERROR: {str(e)}")
+        logger.error(f"Connection check failed: {str(e)}")
         raise
 
 if __name__ == "__main__":
+    setup_logger()
     test_github_connection()
@@ -1,37 +1,68 @@
 #!/usr/bin/env python3
 
+import hashlib
+import hmac
+import json
 import os
-from dotenv import load_dotenv
+import sys
+from concurrent.futures import ThreadPoolExecutor
+import requests
 from loguru import logger
-from pr_manager import PullRequestManager
+from core.logger import setup_logger
+from config.settings import load_env
+
+MAX_SENDERS = 8  # events posted concurrently
+
+def send_issue_event(session: requests.Session, url: str, secret: str, number: int) -> bool:
+    """Sends a signed synthetic "issue opened" event; returns True if the server queued it."""
+    body = json.dumps({"action": "opened", "issue": {"number": number}}).encode("utf-8")
+    signature = "sha256=" + hmac.new(secret.encode("utf-8"), body, hashlib.sha256).hexdigest()
+    
+    logger.info(f"Processing issue #{number}...")
+    response = session.post(
+        url,
+        data=body,
+        headers={
+            "Content-Type": "application/json",
+            "X-GitHub-Event": "issues",
+            "X-Hub-Signature-256": signature
+        },
+        timeout=10
+    )
+    
+    if response.status_code == 202:
+        logger.info(f"Issue #{number} queued - see the webhook server logs for the pull request")
+        return True
+    logger.warning(f"Webhook server did not queue issue #{number} (HTTP {response.status_code})")
+    return False
 
 def main():
-    # Load environment variables
-    load_dotenv()
+    # Load environment variables (once per process)
+    load_env()
     
-    # Get GitHub token
-    token = os.getenv("GITHUB_TOKEN")
-    if not token:
-        print("ERROR: No GITHUB_TOKEN found in .env file")
+    # Get the webhook secret shared with webhook_server.py
+    secret = os.getenv("GITHUB_WEBHOOK_SECRET")
+    if not secret:
+        logger.error("No GITHUB_WEBHOOK_SECRET found in .env file")
         return
     
     try:
-        # Initialize the PR manager
-        repo_name = "TheGrayGryphon/Run8-Speed-Check"
-        manager = PullRequestManager(token, repo_name)
-        
-        # Process issue #2 (the 0 MPH Error issue)
-        print(f"Processing issue #2...")
-        pr_url = manager.process_issue(2)
+        # Send synthetic "issue opened" events for the issues given on the command line,
+        # issue #2 (the 0 MPH Error issue) by default, to a running webhook server which
+        # processes them on its worker threads
+        issue_numbers = [int(arg) for arg in sys.argv[1:]] or [2]
+        url = os.getenv("WEBHOOK_URL", "http://localhost:8000/gh")
         
-        if pr_url:
-            print(f"Created pull request: {pr_url}")
-        else:
-            print("Could not create pull request - see logs for details")
+        with requests.Session() as session, ThreadPoolExecutor(max_workers=MAX_SENDERS) as executor:
+            queued = list(executor.map(
+                lambda number: send_issue_event(session, url, secret, number), issue_numbers
+            ))
+        logger.info(f"Queued {sum(queued)}/{len(issue_numbers)} issues")
             
     except Exception as e:
-        print(f"ERROR: {str(e)}")
+        logger.error(f"Failed to send the test event: {str(e)}")
         raise
 
 if __name__ == "__main__":
+    setup_logger()
     main()
@@ -0,0 +1,151 @@
+#!/usr/bin/env python3
+
+import hashlib
+import hmac
+import json
+import os
+import queue
+import sys
+import threading
+from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+from dotenv import load_dotenv
+from loguru import logger
+from core.github_client import GitHubClient
+from issue_analyzer import IssueAnalyzer
+from code_fixer import CodeFixer
+from pr_manager import PRManager
+from main import parse_repository_url, process_issue
+
+WEBHOOK_PATH = "/gh"
+WEBHOOK_WORKERS = 2  # issues processed concurrently
+
+# Events that queue an issue, by GitHub event name and action. Comment events are left out
+# because the agent comments on the issues it processes and would re-trigger itself.
+_HANDLED_ACTIONS = {
+    "issues": {"opened", "reopened"},
+}
+
+def verify_signature(secret: bytes, body: bytes, signature: str) -> bool:
+    """Checks a payload against its X-Hub-Signature-256 header."""
+    expected = "sha256=" + hmac.new(secret, body, hashlib.sha256).hexdigest()
+    return hmac.compare_digest(expected, signature or "")
+
+class IssueQueue:
+    """Queue of issue numbers waiting to be processed, ignoring ones already waiting."""
+
+    def __init__(self):
+        self._queue = queue.Queue()
+        self._pending = set()
+        self._lock = threading.Lock()
+
+    def put(self, number: int) -> bool:
+        """Queues an issue number; returns False if it is already waiting."""
+        with self._lock:
+            if number in self._pending:
+                return False
+            self._pending.add(number)
+        self._queue.put(number)
+        return True
+
+    def get(self) -> int:
+        """Blocks until an issue number is available."""
+        number = self._queue.get()
+        with self._lock:
+            self._pending.discard(number)
+        return number
+
+    def task_done(self):
+        """Marks the last issue returned by get() as processed."""
+        self._queue.task_done()
+
+def make_handler(secret: bytes, issues: IssueQueue):
+    """Builds the request handler class for the webhook endpoint."""
+
+    class WebhookHandler(BaseHTTPRequestHandler):
+        def do_POST(self):
+            if self.path != WEBHOOK_PATH:
+                self.send_response(404)
+                self.end_headers()
+                return
+
+            body = self.rfile.read(int(self.headers.get("Content-Length", 0)))
+            if not verify_signature(secret, body, self.headers.get("X-Hub-Signature-256")):
+                logger.warning("Rejected webhook with an invalid signature")
+                self.send_response(401)
+                self.end_headers()
+                return
+
+            try:
+                payload = json.loads(body)
+            except ValueError:
+                self.send_response(400)
+                self.end_headers()
+                return
+
+            event = self.headers.get("X-GitHub-Event", "")
+            issue = payload.get("issue") or {}
+            accepted = (
+                payload.get("action") in _HANDLED_ACTIONS.get(event, ())
+                and "number" in issue
+                and "pull_request" not in issue
+            )
+            if accepted and issues.put(issue["number"]):
+                logger.info(f"Queued issue #{issue['number']} from {event}.{payload['action']}")
+
+            # Acknowledge right away; the work happens on the worker threads
+            self.send_response(202 if accepted else 204)
+            self.end_headers()
+
+        def log_message(self, format, *args):
+            logger.debug(f"{self.address_string()} - {format % args}")
+
+    return WebhookHandler
+
+def worker(issues: IssueQueue, github_client: GitHubClient, repo, code_fixer: CodeFixer, pr_manager: PRManager):
+    """Processes queued issues until the process exits."""
+    while True:
+        number = issues.get()
+        try:
+            github_client.wait_for_rate_limit()
+            # A fresh analyzer lists the repository again, so files pushed since the
+            # last event are scored; the ETag cache makes an unchanged tree cheap
+            issue_analyzer = IssueAnalyzer(repo, github_client)
+            process_issue(repo.get_issue(number), issue_analyzer, code_fixer, pr_manager)
+        except Exception as e:
+            logger.error(f"Error processing issue #{number}: {e}")
+        finally:
+            issues.task_done()
+
+def main():
+    """Serves the webhook endpoint and processes issue events as they arrive."""
+    load_dotenv()
+
+    secret = os.getenv("GITHUB_WEBHOOK_SECRET")
+    repo_url = os.getenv("GITHUB_REPO_URL") or (sys.argv[1] if len(sys.argv) > 1 else None)
+    if not secret or not repo_url:
+        logger.error("GITHUB_WEBHOOK_SECRET and a repository URL (GITHUB_REPO_URL or argument) are required")
+        sys.exit(1)
+
+    github_client = GitHubClient.default()
+    repo = github_client.get_repository(*parse_repository_url(repo_url))
+    code_fixer = CodeFixer(repo, github_client)
+    pr_manager = PRManager(repo, github_client)
+
+    issues = IssueQueue()
+    for _ in range(int(os.getenv("WEBHOOK_WORKERS", WEBHOOK_WORKERS))):
+        threading.Thread(
+            target=worker, args=(issues, github_client, repo, code_fixer, pr_manager), daemon=True
+        ).start()
+
+    port = int(os.getenv("WEBHOOK_PORT", "8000"))
+    server = ThreadingHTTPServer(("", port), make_handler(secret.encode("utf-8"), issues))
+    logger.info(f"Listening for {repo.full_name} webhooks on port {port}{WEBHOOK_PATH}")
+    try:
+        server.serve_forever()
+    except KeyboardInterrupt:
+        logger.info("Shutting down webhook server")
+    finally:
+        server.server_close()
+
+if __name__ == "__main__":
+    main()